@@ -0,0 +1,103 @@
+"""Benchmark de arranque: tiempo y memoria de cada modo.
+
+Lanza varias veces un proceso nuevo por modo y mide, desde afuera, cuánto
+tarda en quedar listo; el proceso informa su memoria residente máxima y
+si cargó Qt. Resultado en JSON por la salida estándar.
+
+    python benchmarks/bench_arranque.py [--repeticiones 5] [--salida arranque.json]
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from comun import RAIZ, argumentos, emitir
+
+# Código que ejecuta cada proceso hijo hasta dejar el modo listo para trabajar
+PREPARAR = {
+    'servicio': """
+from servicio import ServicioApp, DespachadorNotificaciones, NotificadorMemoria
+app = ServicioApp(notificador=DespachadorNotificaciones(NotificadorMemoria))
+""",
+    'gui': """
+from PyQt5.QtWidgets import QApplication
+from ventana import VentanaDespertador
+app_qt = QApplication([])
+ventana = VentanaDespertador()
+ventana.show()
+app_qt.processEvents()
+""",
+}
+
+INFORMAR = """
+import json, sys
+def memoria_maxima():
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        return getattr(info, 'peak_wset', info.rss)
+    except ImportError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    maxima = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa KiB; macOS, bytes
+    return maxima if sys.platform == 'darwin' else maxima * 1024
+print(json.dumps({
+    'rss_max': memoria_maxima(),
+    'modulos': len(sys.modules),
+    'qt_cargado': any(m.startswith('PyQt5') for m in sys.modules),
+}))
+"""
+
+
+def medir(modo, directorio):
+    entorno = dict(os.environ, DESPERTADOR_DIR=directorio, QT_QPA_PLATFORM='offscreen',
+                   DESPERTADOR_NOTIFICADOR='memoria')
+    inicio = time.perf_counter()
+    salida = subprocess.run([sys.executable, '-c', PREPARAR[modo] + INFORMAR],
+                            cwd=RAIZ, env=entorno, capture_output=True, text=True, check=True)
+    segundos = time.perf_counter() - inicio
+    datos = json.loads(salida.stdout.strip().splitlines()[-1])
+    datos['segundos'] = segundos
+    return datos
+
+
+def resumir(muestras):
+    tiempos = [m['segundos'] for m in muestras]
+    memorias = [m['rss_max'] for m in muestras if m['rss_max'] is not None]
+    return {
+        'segundos_mediana': statistics.median(tiempos),
+        'segundos_min': min(tiempos),
+        'segundos_max': max(tiempos),
+        'rss_max_mediana': statistics.median(memorias) if memorias else None,
+        'modulos': muestras[-1]['modulos'],
+        'qt_cargado': muestras[-1]['qt_cargado'],
+    }
+
+
+def main():
+    parser = argumentos(__doc__.splitlines()[0])
+    parser.add_argument('--repeticiones', type=int, default=5)
+    parser.add_argument('--modos', nargs='+', choices=sorted(PREPARAR), default=sorted(PREPARAR))
+    args = parser.parse_args()
+
+    modos = {}
+    with tempfile.TemporaryDirectory() as directorio:
+        for modo in args.modos:
+            muestras = [medir(modo, directorio) for _ in range(args.repeticiones)]
+            modos[modo] = resumir(muestras)
+
+    emitir('arranque', {'modos': modos}, args.salida)
+    if modos.get('servicio', {}).get('qt_cargado'):
+        print("ERROR: el modo servicio cargó Qt", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
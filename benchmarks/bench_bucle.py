@@ -0,0 +1,72 @@
+"""Benchmark del loop del servicio con reloj virtual y notificador falso.
+
+    python benchmarks/bench_bucle.py [--ciclos 5000] [--intervalo 30] [--salida bucle.json]
+
+Corre ServicioApp.ejecutar_servicio() real sobre un RelojVirtual: las
+esperas adelantan el tiempo en lugar de dormir, así miles de ciclos se
+simulan en segundos. Cada entrega consume --demora segundos virtuales y
+cada espera se pasa hasta --retraso-max segundos, para comprobar que ni el
+trabajo ni el retraso se acumulan como deriva. Informa el error de cada
+aviso respecto de su plazo ideal (k * intervalo) y las escrituras de
+status.json.
+"""
+from comun import RelojConRetraso, argumentos, emitir, preparar_directorio, resumen
+
+DIRECTORIO = preparar_directorio()
+
+import contextlib  # noqa: E402
+import io  # noqa: E402
+import json  # noqa: E402
+import time  # noqa: E402
+
+import servicio  # noqa: E402
+
+
+def main():
+    parser = argumentos(__doc__.splitlines()[0])
+    parser.add_argument('--ciclos', type=int, default=5000)
+    parser.add_argument('--intervalo', type=float, default=30)
+    parser.add_argument('--demora', type=float, default=0.5, help='segundos virtuales por entrega')
+    parser.add_argument('--retraso-max', type=float, default=0.05, help='segundos virtuales de retraso por espera')
+    args = parser.parse_args()
+
+    with open(servicio.CONFIG_FILE, 'w') as f:
+        json.dump({'intervalo': args.intervalo}, f)
+
+    reloj = RelojConRetraso(args.retraso_max)
+    app = None
+
+    def al_entregar(n):
+        if n >= args.ciclos:
+            app.detener("Fin del benchmark")
+
+    notificador = servicio.NotificadorMemoria(reloj, args.demora, al_entregar)
+    app = servicio.ServicioApp(reloj=reloj,
+                               notificador=servicio.DespachadorNotificaciones(lambda: notificador))
+
+    escrituras = []
+    flush_original = app.estado.flush
+    app.estado.flush = lambda: escrituras.append(flush_original()) or escrituras[-1]
+
+    inicio = time.perf_counter()
+    # emitir_aviso() imprime cada aviso; no mezclarlo con el JSON
+    with contextlib.redirect_stdout(io.StringIO()):
+        app.ejecutar_servicio()
+    segundos = time.perf_counter() - inicio
+
+    errores = [t - (k + 1) * args.intervalo for k, t in enumerate(notificador.instantes)]
+    emitir('bucle', {
+        'ciclos': len(notificador.instantes),
+        'intervalo': args.intervalo,
+        'segundos_reales': segundos,
+        'segundos_simulados': reloj.monotonico(),
+        'ciclos_por_segundo': len(notificador.instantes) / segundos,
+        'error_plazo': resumen([abs(e) for e in errores]),
+        'deriva_final': errores[-1] if errores else None,
+        'escrituras_estado': sum(1 for e in escrituras if e),
+        'llamadas_flush': len(escrituras),
+    }, args.salida)
+
+
+if __name__ == '__main__':
+    main()
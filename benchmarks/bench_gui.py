@@ -0,0 +1,98 @@
+"""Benchmark de refresco de la GUI con la plataforma Qt offscreen.
+
+    python benchmarks/bench_gui.py [--repeticiones 200] [--salida gui.json]
+
+Mide VentanaDespertador.actualizar_datos() sin cambios, con una línea de
+log nueva y con un aviso nuevo (estado + log), sobre un log de --lineas
+líneas previas. La lectura la hace el hilo del trabajador: cada muestra
+espera a que vuelva su señal (datos sin cambios, logs con líneas nuevas) y
+la ventana la procese, no sólo a que salga el pedido.
+"""
+from comun import argumentos, cronometrar, emitir, preparar_directorio, resumen
+
+preparar_directorio()
+
+import time  # noqa: E402
+
+from PyQt5.QtCore import QEventLoop, QTimer  # noqa: E402
+from PyQt5.QtWidgets import QApplication  # noqa: E402
+
+import servicio  # noqa: E402
+from ventana import VentanaDespertador  # noqa: E402
+
+ESPERA_MAXIMA_MS = 10000
+
+
+def agregar_linea(texto):
+    with open(servicio.LOG_FILE, 'a', encoding='utf-8') as f:
+        f.write(time.strftime(f"[%Y-%m-%d %H:%M:%S] {texto}\n"))
+
+
+def esperar_senal(senal, accion):
+    """Ejecuta accion y procesa eventos hasta que llegue senal (en el hilo de la GUI)"""
+    bucle = QEventLoop()
+    limite = QTimer()
+    limite.setSingleShot(True)
+    limite.timeout.connect(bucle.quit)
+    senal.connect(bucle.quit)
+    try:
+        accion()
+        limite.start(ESPERA_MAXIMA_MS)
+        bucle.exec_()
+    finally:
+        senal.disconnect(bucle.quit)
+    if not limite.isActive():
+        raise RuntimeError("El trabajador no respondió")
+    limite.stop()
+
+
+def main():
+    parser = argumentos(__doc__.splitlines()[0])
+    parser.add_argument('--repeticiones', type=int, default=200)
+    parser.add_argument('--lineas', type=int, default=100000)
+    args = parser.parse_args()
+
+    for i in range(args.lineas):
+        agregar_linea(f"Aviso #{i} emitido")
+
+    app_qt = QApplication([])
+    app = servicio.ServicioApp(notificador=servicio.DespachadorNotificaciones(servicio.NotificadorMemoria))
+
+    # La apertura termina cuando el panel muestra la carga inicial del log
+    inicio = time.perf_counter()
+    ventana = VentanaDespertador()
+    ventana.show()
+    while not ventana.historial_logs:
+        app_qt.processEvents(QEventLoop.AllEvents, 10)
+    apertura = time.perf_counter() - inicio
+
+    def sin_cambios():
+        esperar_senal(ventana.trabajador.datos, ventana.actualizar_datos)
+
+    def con_linea():
+        agregar_linea("Notificación enviada")
+        esperar_senal(ventana.trabajador.logs, ventana.actualizar_datos)
+
+    def con_aviso():
+        app.contador_avisos += 1
+        app.ultimo_aviso = time.strftime("%H:%M:%S")
+        app.guardar_estado()
+        agregar_linea(f"Aviso #{app.contador_avisos} emitido")
+        esperar_senal(ventana.trabajador.logs, ventana.actualizar_datos)
+
+    try:
+        resultados = {
+            'lineas_previas': args.lineas,
+            'apertura_ventana': apertura,
+            'sin_cambios': resumen(cronometrar(sin_cambios, args.repeticiones)),
+            'linea_nueva': resumen(cronometrar(con_linea, args.repeticiones)),
+            'aviso_nuevo': resumen(cronometrar(con_aviso, args.repeticiones)),
+        }
+    finally:
+        # Termina el hilo del trabajador (sus timers se detienen en ese hilo)
+        ventana.close()
+    emitir('gui', resultados, args.salida)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+"""Benchmark de E/S: escritura del log, escritura de status.json y lectura del log.
+
+    python benchmarks/bench_io.py [--lineas 50000] [--max-mb 100] [--salida io.json]
+
+- log_sincrono: AlmacenLogs.escribir() de a una línea (una apertura por línea).
+- log_asincrono: EscritorLogAsync, tiempo de encolar y de vaciar la cola.
+- estado: GestorEstado.flush() con un cambio por llamada y sin cambios.
+- historial: HistorialAvisos.registrar() de un aviso (fila + resúmenes) y
+  lectura del resumen de 7 días.
+- leer_logs: primera lectura (cola del archivo) y lectura incremental de una
+  línea nueva, para logs de 1 KB a --max-mb MB; como referencia, el
+  readlines() completo que se usaba antes.
+"""
+from comun import argumentos, cronometrar, emitir, preparar_directorio, resumen
+
+DIRECTORIO = preparar_directorio()
+
+import time  # noqa: E402
+
+import servicio  # noqa: E402
+from historial import HistorialAvisos  # noqa: E402
+
+LINEA = time.strftime("[%Y-%m-%d %H:%M:%S] Notificación enviada para Aviso #1234 (12 ms)\n")
+
+
+def bench_log_sincrono(lineas):
+    almacen = servicio.AlmacenLogs(DIRECTORIO / 'sincrono.log', DIRECTORIO / 'seg-sincrono',
+                                   max_bytes=1 << 40, max_edad=1 << 40)
+    inicio = time.perf_counter()
+    for _ in range(lineas):
+        almacen.escribir(LINEA)
+    segundos = time.perf_counter() - inicio
+    return {'lineas': lineas, 'segundos': segundos, 'lineas_por_segundo': lineas / segundos}
+
+
+def bench_log_asincrono(lineas):
+    almacen = servicio.AlmacenLogs(DIRECTORIO / 'asincrono.log', DIRECTORIO / 'seg-asincrono',
+                                   max_bytes=1 << 40, max_edad=1 << 40)
+    # Cola holgada: con más del 80% ocupado el escritor muestrea y no se
+    # estaría midiendo la escritura de todas las líneas
+    escritor = servicio.EscritorLogAsync(almacen, max_cola=2 * lineas)
+    inicio = time.perf_counter()
+    for _ in range(lineas):
+        escritor.escribir(LINEA)
+    encolado = time.perf_counter() - inicio
+    escritor.cerrar(timeout=120)
+    total = time.perf_counter() - inicio
+    escritas = sum(1 for _ in open(almacen.ruta, encoding='utf-8'))
+    return {
+        'lineas': lineas,
+        'escritas': escritas,
+        'encolar_us_por_linea': encolado / lineas * 1e6,
+        'segundos_hasta_disco': total,
+        'lineas_por_segundo': escritas / total,
+    }
+
+
+def bench_estado(repeticiones):
+    gestor = servicio.GestorEstado(DIRECTORIO / 'status-bench.json')
+    contador = iter(range(10 ** 9))
+
+    def con_cambio():
+        gestor.actualizar(corriendo=True, contador_avisos=next(contador), ultimo_aviso='14:30:45')
+        gestor.flush()
+
+    return {
+        'con_cambio': resumen(cronometrar(con_cambio, repeticiones)),
+        'sin_cambio': resumen(cronometrar(gestor.flush, repeticiones)),
+    }
+
+
+def bench_historial(repeticiones):
+    historial = HistorialAvisos(DIRECTORIO / 'historial-bench.db')
+    numero = iter(range(1, 10 ** 9))
+
+    def registrar():
+        ahora = time.time()
+        historial.registrar(next(numero), 'principal', ahora, True, 0.012, programado=ahora - 0.002)
+
+    resultado = {
+        'registrar': resumen(cronometrar(registrar, repeticiones)),
+        'resumen_7_dias': resumen(cronometrar(lambda: historial.resumen_dias(7), repeticiones)),
+    }
+    historial.cerrar()
+    return resultado
+
+
+def generar_log(ruta, tamanio):
+    bloque = LINEA * max(1, (1 << 20) // len(LINEA))
+    with open(ruta, 'w', encoding='utf-8') as f:
+        escrito = 0
+        while escrito + len(bloque) <= tamanio:
+            f.write(bloque)
+            escrito += len(bloque)
+        resto = (tamanio - escrito) // len(LINEA)
+        f.write(LINEA * max(1, resto))
+
+
+def bench_leer_logs(max_mb):
+    tamanios = [1 << 10, 1 << 20, 10 << 20, 100 << 20]
+    resultados = []
+    for tamanio in tamanios:
+        if tamanio > max_mb << 20:
+            break
+        ruta = DIRECTORIO / f'lectura-{tamanio}.log'
+        generar_log(ruta, tamanio)
+
+        lector = servicio.LectorLog(ruta, 30)
+        inicio = time.perf_counter()
+        lector.leer()
+        primera = time.perf_counter() - inicio
+
+        def incremental():
+            with open(ruta, 'a', encoding='utf-8') as f:
+                f.write(LINEA)
+            lector.leer()
+
+        def readlines():
+            with open(ruta, 'r', encoding='utf-8') as f:
+                return ''.join(f.readlines()[-30:])
+
+        resultados.append({
+            'bytes': ruta.stat().st_size,
+            'primera_lectura': primera,
+            'incremental': resumen(cronometrar(incremental, 50)),
+            'readlines_completo': resumen(cronometrar(readlines, 3)),
+        })
+        ruta.unlink()
+    return resultados
+
+
+def main():
+    parser = argumentos(__doc__.splitlines()[0])
+    parser.add_argument('--lineas', type=int, default=50000)
+    parser.add_argument('--repeticiones', type=int, default=500)
+    parser.add_argument('--max-mb', type=int, default=100)
+    args = parser.parse_args()
+
+    emitir('io', {
+        'log_sincrono': bench_log_sincrono(args.lineas),
+        'log_asincrono': bench_log_asincrono(args.lineas),
+        'estado': bench_estado(args.repeticiones),
+        'historial': bench_historial(args.repeticiones),
+        'leer_logs': bench_leer_logs(args.max_mb),
+    }, args.salida)
+
+
+if __name__ == '__main__':
+    main()
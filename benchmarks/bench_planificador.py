@@ -0,0 +1,71 @@
+"""Benchmark del planificador de recordatorios con miles de recordatorios.
+
+    python benchmarks/bench_planificador.py [--cantidades 100 1000 10000] [--salida planificador.json]
+
+Para cada cantidad mide: programar todos desde cero, buscar y reprogramar
+el próximo disparo (lo que hace el loop en cada aviso) y aplicar una
+configuración con un solo recordatorio modificado. Mezcla intervalos y
+horas fijas, con días y pausas.
+"""
+from comun import argumentos, cronometrar, emitir, resumen
+
+import time
+
+from recordatorios import DIAS_LABORABLES, Planificador, Recordatorio
+
+
+def crear(cantidad):
+    recordatorios = []
+    for i in range(cantidad):
+        if i % 4 == 3:
+            recordatorios.append(Recordatorio(f'r{i}', hora=f'{i % 24:02d}:{i % 60:02d}',
+                                              dias=DIAS_LABORABLES))
+        else:
+            recordatorios.append(Recordatorio(f'r{i}', intervalo=60 + i % 3600,
+                                              pausas=['13:00-14:00'] if i % 2 else ()))
+    return recordatorios
+
+
+def medir(cantidad, repeticiones):
+    recordatorios = crear(cantidad)
+    pared = time.time()
+
+    def programar():
+        Planificador().aplicar(recordatorios, 0.0, pared)
+
+    planificador = Planificador()
+    planificador.aplicar(recordatorios, 0.0, pared)
+
+    def disparar():
+        plazo, nombre = planificador.proximo()
+        planificador.disparar(nombre, plazo, pared + plazo)
+
+    editados = list(recordatorios)
+    vuelta = [0]
+
+    def editar():
+        vuelta[0] += 1
+        editados[0] = Recordatorio('r0', intervalo=60 + vuelta[0])
+        planificador.aplicar(editados, 0.0, pared)
+
+    return {
+        'programar_todos': resumen(cronometrar(programar, max(1, repeticiones // 100))),
+        'disparo': resumen(cronometrar(disparar, repeticiones)),
+        'editar_uno': resumen(cronometrar(editar, max(1, repeticiones // 100))),
+        'tamanio_heap': len(planificador.heap),
+    }
+
+
+def main():
+    parser = argumentos(__doc__.splitlines()[0])
+    parser.add_argument('--cantidades', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--repeticiones', type=int, default=10000)
+    args = parser.parse_args()
+
+    emitir('planificador', {
+        str(cantidad): medir(cantidad, args.repeticiones) for cantidad in args.cantidades
+    }, args.salida)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,210 @@
+"""Comprobaciones con reloj virtual: fallan si el servicio pierde precisión.
+
+    python benchmarks/comprobaciones.py [--salida comprobaciones.json]
+
+A diferencia de los benchmarks no se miran tiempos sino resultados. Corren
+el loop real de ServicioApp sobre un RelojVirtual con un NotificadorMemoria
+que anota el instante virtual de cada entrega, y las piezas que el loop no
+ejercita (LectorLog, pausas del Planificador). Termina con código 1 si
+alguna comprobación falla, así correr_todos.py también lo marca.
+
+- cadencia_exacta: sin retraso en las esperas cada aviso sale justo en
+  k * intervalo, aunque la entrega consuma tiempo (deriva 0).
+- cadencia_con_retraso: con esperas que terminan hasta RETRASO_MAX tarde,
+  ningún aviso se pasa de ese margen y el retraso no se acumula.
+- sin_adelantos: los despertares por latido no adelantan avisos.
+- log_truncado / log_rotado: LectorLog vuelve a empezar tras "Limpiar Logs"
+  y sigue el archivo nuevo tras una rotación.
+- rotacion_tras_limpiar: AlmacenLogs mide la edad del log desde la primera
+  línea escrita después de "Limpiar Logs", no desde la del log anterior.
+- pausa_medianoche: una pausa "22:00-07:00" no deja avisos adentro y el
+  intervalo conserva su fase al salir de ella.
+"""
+from comun import RelojConRetraso, argumentos, emitir, preparar_directorio
+
+DIRECTORIO = preparar_directorio()
+
+import contextlib  # noqa: E402
+import io  # noqa: E402
+import json  # noqa: E402
+import os  # noqa: E402
+import sys  # noqa: E402
+from datetime import datetime, timedelta  # noqa: E402
+
+import servicio  # noqa: E402
+from reloj import RelojVirtual  # noqa: E402
+from recordatorios import Planificador, Recordatorio  # noqa: E402
+
+INTERVALO = 30
+DEMORA = 0.5        # segundos virtuales por entrega
+RETRASO_MAX = 0.05  # segundos virtuales que se pasa cada espera
+AVISOS = 300
+TOLERANCIA = 1e-6
+
+
+def correr_servicio(reloj, intervalo, avisos, latido=None):
+    """Corre el loop real hasta entregar avisos notificaciones; devuelve sus instantes"""
+    with open(servicio.CONFIG_FILE, 'w') as f:
+        json.dump({'intervalo': intervalo}, f)
+    app = None
+
+    def al_enviar(n):
+        # terminar() y no detener(): no deja 'corriendo': false para la próxima corrida
+        if n >= avisos:
+            app.terminar("Fin de la comprobación")
+
+    notificador = servicio.NotificadorMemoria(reloj, DEMORA, al_enviar)
+    app = servicio.ServicioApp(reloj=reloj, latido=latido,
+                               notificador=servicio.DespachadorNotificaciones(lambda: notificador))
+    # emitir_aviso() imprime cada aviso; no mezclarlo con el JSON
+    with contextlib.redirect_stdout(io.StringIO()):
+        app.ejecutar_servicio()
+    return notificador.instantes
+
+
+def errores_plazo(instantes, intervalo):
+    return [t - (k + 1) * intervalo for k, t in enumerate(instantes)]
+
+
+def comprobar_cadencia_exacta():
+    errores = errores_plazo(correr_servicio(RelojVirtual(), INTERVALO, AVISOS), INTERVALO)
+    assert len(errores) == AVISOS, f"se entregaron {len(errores)} de {AVISOS} avisos"
+    peor = max(abs(e) for e in errores)
+    assert peor <= TOLERANCIA, f"error máximo {peor:.6f}s (se espera 0)"
+    assert abs(errores[-1]) <= TOLERANCIA, f"deriva final {errores[-1]:.6f}s (se espera 0)"
+    return {'avisos': len(errores), 'error_max': peor, 'deriva_final': errores[-1]}
+
+
+def comprobar_cadencia_con_retraso():
+    reloj = RelojConRetraso(RETRASO_MAX)
+    errores = errores_plazo(correr_servicio(reloj, INTERVALO, AVISOS), INTERVALO)
+    assert len(errores) == AVISOS, f"se entregaron {len(errores)} de {AVISOS} avisos"
+    assert min(errores) >= -TOLERANCIA, f"un aviso salió {-min(errores):.6f}s antes de su plazo"
+    peor = max(errores)
+    assert peor <= RETRASO_MAX + TOLERANCIA, f"error máximo {peor:.6f}s (margen {RETRASO_MAX}s)"
+    assert errores[-1] <= RETRASO_MAX + TOLERANCIA, f"el retraso se acumula: deriva final {errores[-1]:.6f}s"
+    return {'avisos': len(errores), 'error_max': peor, 'deriva_final': errores[-1]}
+
+
+def comprobar_sin_adelantos():
+    # Intervalo que no es múltiplo del latido (un latido cae 1 s antes de
+    # cada aviso, dentro de la ventana de agrupación) y más largo que el
+    # ritmo del límite de notificaciones, que si no los retendría
+    intervalo = 2 * servicio.LATIDO_INTERVALO + 1
+    latido = servicio.Latido(DIRECTORIO / 'latido-comprobacion.json')
+    errores = errores_plazo(correr_servicio(RelojVirtual(), intervalo, 50, latido), intervalo)
+    assert min(errores) >= -TOLERANCIA, f"un aviso salió {-min(errores):.3f}s antes de su plazo"
+    assert max(errores) <= TOLERANCIA, f"un aviso salió {max(errores):.3f}s tarde"
+    return {'avisos': len(errores), 'intervalo': intervalo}
+
+
+def comprobar_log_truncado():
+    ruta = DIRECTORIO / 'truncado.log'
+    ruta.write_text(''.join(f"linea {i}\n" for i in range(100)), encoding='utf-8')
+    lector = servicio.LectorLog(ruta, 10)
+    reiniciado, lineas = lector.leer_nuevas()
+    assert reiniciado and lineas == [f"linea {i}\n" for i in range(90, 100)], lineas
+
+    # Más corto que lo leído
+    ruta.write_text("nueva 1\n", encoding='utf-8')
+    assert lector.leer_nuevas() == (True, ["nueva 1\n"]), "no detectó el truncado"
+    # Reescrito con más bytes que lo leído: lo detecta la firma
+    ruta.write_text("otra 1\notra 2\notra 3\n", encoding='utf-8')
+    assert lector.leer_nuevas() == (True, ["otra 1\n", "otra 2\n", "otra 3\n"]), "no detectó la reescritura"
+    # Una línea sin salto final se entrega cuando se completa
+    with open(ruta, 'a', encoding='utf-8') as f:
+        f.write("incomp")
+    assert lector.leer_nuevas() == (False, []), "entregó una línea incompleta"
+    with open(ruta, 'a', encoding='utf-8') as f:
+        f.write("leta\n")
+    assert lector.leer_nuevas() == (False, ["incompleta\n"]), "perdió el comienzo de una línea"
+    return {}
+
+
+def comprobar_log_rotado():
+    ruta = DIRECTORIO / 'rotado.log'
+    ruta.write_text("vieja 1\nvieja 2\n", encoding='utf-8')
+    lector = servicio.LectorLog(ruta, 10)
+    lector.leer_nuevas()
+    os.replace(ruta, DIRECTORIO / 'rotado.log.1')
+    ruta.write_text("nueva 1\nnueva 2\nnueva 3\n", encoding='utf-8')
+    # Tras una rotación las líneas del archivo nuevo se informan como agregadas
+    assert lector.leer_nuevas() == (False, ["nueva 1\n", "nueva 2\n", "nueva 3\n"]), "no siguió la rotación"
+    with open(ruta, 'a', encoding='utf-8') as f:
+        f.write("nueva 4\n")
+    assert lector.leer_nuevas() == (False, ["nueva 4\n"]), "no siguió el archivo nuevo"
+    # Las líneas del archivo anterior ya no están en la cola
+    assert lector.leer() == "nueva 1\nnueva 2\nnueva 3\nnueva 4\n", lector.leer()
+    return {}
+
+
+def comprobar_rotacion_tras_limpiar():
+    almacen = servicio.AlmacenLogs(DIRECTORIO / 'limpiado.log', DIRECTORIO / 'seg-limpiado', max_edad=3600)
+    inicio = datetime(2026, 1, 5, 8, 0)
+    almacen.ahora = lambda: inicio
+    almacen.escribir(f"[{inicio:%Y-%m-%d %H:%M:%S}] vieja 1\n")
+    almacen.escribir(f"[{inicio:%Y-%m-%d %H:%M:%S}] vieja 2\n")
+    # "Limpiar Logs": el archivo se trunca y conserva el inodo
+    open(almacen.ruta, 'w').close()
+    nueva = inicio + timedelta(minutes=50)
+    almacen.escribir(f"[{nueva:%Y-%m-%d %H:%M:%S}] nueva 1\n")
+    # Una hora después de la primera línea vieja, pero no de la nueva
+    almacen.ahora = lambda: inicio + timedelta(minutes=61)
+    almacen.escribir(f"[{nueva:%Y-%m-%d %H:%M:%S}] nueva 2\n")
+    assert not almacen.segmentos(), "archivó el log recién limpiado por la edad del anterior"
+    almacen.ahora = lambda: nueva + timedelta(minutes=61)
+    almacen.escribir(f"[{nueva:%Y-%m-%d %H:%M:%S}] nueva 3\n")
+    assert len(almacen.segmentos()) == 1, "no rotó por edad"
+    return {}
+
+
+def comprobar_pausa_medianoche():
+    recordatorio = Recordatorio('noche', intervalo=3600, pausas=['22:00-07:00'])
+    planificador = Planificador()
+    inicio = datetime(2026, 1, 5, 20, 30).timestamp()
+    planificador.aplicar([recordatorio], 0.0, inicio)
+
+    disparos = []
+    for _ in range(3 * 15):
+        plazo, nombre = planificador.proximo()
+        disparos.append(datetime.fromtimestamp(inicio + plazo))
+        assert planificador.disparar(nombre, plazo, inicio + plazo) == 0
+    adentro = [d for d in disparos if d.hour >= 22 or d.hour < 7]
+    assert not adentro, f"avisos dentro de la pausa: {adentro[:3]}"
+    # 21:30 es el último antes de la pausa; la fase (:30) sigue a las 07:30 del día siguiente
+    assert disparos[:3] == [datetime(2026, 1, 5, 21, 30), datetime(2026, 1, 6, 7, 30),
+                            datetime(2026, 1, 6, 8, 30)], disparos[:3]
+    assert all(d.minute == 30 for d in disparos), "el intervalo perdió la fase"
+    return {'disparos': len(disparos), 'ultimo': disparos[-1].isoformat()}
+
+
+COMPROBACIONES = {
+    'cadencia_exacta': comprobar_cadencia_exacta,
+    'cadencia_con_retraso': comprobar_cadencia_con_retraso,
+    'sin_adelantos': comprobar_sin_adelantos,
+    'log_truncado': comprobar_log_truncado,
+    'log_rotado': comprobar_log_rotado,
+    'rotacion_tras_limpiar': comprobar_rotacion_tras_limpiar,
+    'pausa_medianoche': comprobar_pausa_medianoche,
+}
+
+
+def main():
+    parser = argumentos(__doc__.splitlines()[0])
+    args = parser.parse_args()
+
+    resultados, fallidas = {}, []
+    for nombre, comprobar in COMPROBACIONES.items():
+        try:
+            resultados[nombre] = dict(comprobar(), ok=True)
+        except AssertionError as e:
+            resultados[nombre] = {'ok': False, 'error': str(e)}
+            fallidas.append(nombre)
+    emitir('comprobaciones', resultados, args.salida)
+    if fallidas:
+        print(f"ERROR: fallaron {', '.join(fallidas)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
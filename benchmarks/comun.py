@@ -0,0 +1,97 @@
+"""Utilidades compartidas por los benchmarks.
+
+Cada benchmark corre sobre una carpeta de datos temporal (DESPERTADOR_DIR),
+que hay que preparar antes de importar servicio, y emite su resultado como
+JSON para poder comparar corridas.
+"""
+import argparse
+import atexit
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+if str(RAIZ) not in sys.path:
+    sys.path.insert(0, str(RAIZ))
+
+# reloj no elige la carpeta de datos al importarse (servicio sí)
+from reloj import RelojVirtual  # noqa: E402
+
+
+class RelojConRetraso(RelojVirtual):
+    """Reloj virtual cuyas esperas terminan un poco tarde, como las reales"""
+
+    def __init__(self, retraso_max, semilla=1):
+        super().__init__()
+        self.retraso_max = retraso_max
+        self.azar = random.Random(semilla)
+
+    def esperar(self, evento, timeout):
+        return super().esperar(evento, timeout + self.azar.uniform(0, self.retraso_max))
+
+
+def preparar_directorio():
+    """Crea una carpeta de datos temporal y la activa para servicio/ventana"""
+    directorio = tempfile.mkdtemp(prefix='despertador-bench-')
+    atexit.register(shutil.rmtree, directorio, True)
+    os.environ['DESPERTADOR_DIR'] = directorio
+    os.environ.setdefault('DESPERTADOR_NOTIFICADOR', 'memoria')
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    return Path(directorio)
+
+
+def argumentos(descripcion):
+    parser = argparse.ArgumentParser(description=descripcion)
+    parser.add_argument('--salida', help='archivo JSON donde guardar el resultado')
+    return parser
+
+
+def resumen(muestras):
+    """Estadísticas de una lista de duraciones en segundos"""
+    ordenadas = sorted(muestras)
+    if not ordenadas:
+        return {'n': 0}
+
+    def percentil(p):
+        return ordenadas[min(len(ordenadas) - 1, int(p / 100 * len(ordenadas)))]
+
+    return {
+        'n': len(ordenadas),
+        'media': statistics.fmean(ordenadas),
+        'p50': percentil(50),
+        'p95': percentil(95),
+        'p99': percentil(99),
+        'max': ordenadas[-1],
+    }
+
+
+def cronometrar(funcion, repeticiones):
+    """Ejecuta funcion varias veces y devuelve la lista de duraciones"""
+    muestras = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        muestras.append(time.perf_counter() - inicio)
+    return muestras
+
+
+def emitir(nombre, resultados, salida=None):
+    """Imprime (y opcionalmente guarda) el resultado en JSON"""
+    documento = {
+        'benchmark': nombre,
+        'fecha': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': sys.version.split()[0],
+        'plataforma': sys.platform,
+        'resultados': resultados,
+    }
+    texto = json.dumps(documento, indent=2, ensure_ascii=False)
+    print(texto)
+    if salida:
+        Path(salida).write_text(texto + '\n', encoding='utf-8')
+    return documento
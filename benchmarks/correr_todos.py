@@ -0,0 +1,58 @@
+"""Corre todos los benchmarks y junta sus resultados en un solo JSON.
+
+    python benchmarks/correr_todos.py [--salida resultados.json] [--rapido]
+
+Cada benchmark corre en su propio proceso (con su propia carpeta de datos
+temporal). --rapido usa tamaños chicos, útil para verificar que todo anda.
+"""
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+DIRECTORIO = Path(__file__).resolve().parent
+
+BENCHMARKS = {
+    'arranque': ('bench_arranque.py', ['--repeticiones', '1']),
+    'io': ('bench_io.py', ['--lineas', '2000', '--repeticiones', '50', '--max-mb', '1']),
+    'gui': ('bench_gui.py', ['--repeticiones', '20', '--lineas', '1000']),
+    'planificador': ('bench_planificador.py', ['--repeticiones', '1000', '--cantidades', '100', '1000']),
+    'bucle': ('bench_bucle.py', ['--ciclos', '500']),
+    'comprobaciones': ('comprobaciones.py', []),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--salida', help='archivo JSON donde guardar el resultado')
+    parser.add_argument('--rapido', action='store_true')
+    parser.add_argument('--solo', nargs='+', choices=sorted(BENCHMARKS))
+    args = parser.parse_args()
+
+    resultados = {}
+    with tempfile.TemporaryDirectory() as temporal:
+        for nombre in args.solo or BENCHMARKS:
+            script, rapidos = BENCHMARKS[nombre]
+            archivo = Path(temporal) / f'{nombre}.json'
+            comando = [sys.executable, str(DIRECTORIO / script), '--salida', str(archivo)]
+            if args.rapido:
+                comando += rapidos
+            print(f"Corriendo {nombre}...", file=sys.stderr)
+            proceso = subprocess.run(comando, stdout=subprocess.DEVNULL)
+            if proceso.returncode != 0 or not archivo.exists():
+                resultados[nombre] = {'error': f'terminó con código {proceso.returncode}'}
+                continue
+            resultados[nombre] = json.loads(archivo.read_text(encoding='utf-8'))
+
+    texto = json.dumps(resultados, indent=2, ensure_ascii=False)
+    print(texto)
+    if args.salida:
+        Path(args.salida).write_text(texto + '\n', encoding='utf-8')
+    if any('error' in r for r in resultados.values()):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""Comandos de consola para consultar y manejar el servicio sin abrir la GUI.
+
+No importan Qt ni la librería de notificaciones, así responden rápido
+desde scripts, agentes de monitoreo o scripts de inicio de sesión. Usan el
+canal IPC y, si el servicio no lo tiene abierto, los mismos archivos que la
+GUI. Cada función devuelve el código de salida del proceso.
+"""
+import json
+import sys
+import time
+
+from servicio import (LOG_FILE, STATUS_FILE, LectorLog, leer_estado, escribir_json_atomico,
+                      guardar_config_file, enviar_comando, estado_servicio)
+
+TAIL_INTERVALO = 0.5   # cada cuánto --tail -f revisa si el log creció
+IPC_TIMEOUT = 1.0
+
+
+def estado(como_json=False):
+    """--status: 0 si el servicio está vivo, 1 si no"""
+    servicio = estado_servicio()
+    respuesta = enviar_comando('estado', timeout=IPC_TIMEOUT) if servicio['vivo'] else None
+    if respuesta and respuesta.get('ok'):
+        datos, fuente = respuesta, 'ipc'
+    else:
+        datos, fuente = leer_estado() or {}, 'archivo'
+    datos.pop('ok', None)
+    datos.update(vivo=servicio['vivo'], pid=servicio['pid'],
+                 supervisor=servicio['supervisor'], fuente=fuente)
+
+    if como_json:
+        print(json.dumps(datos, ensure_ascii=False))
+        return 0 if servicio['vivo'] else 1
+
+    supervisor = servicio['supervisor']
+    if servicio['vivo']:
+        texto = f"Ejecutándose (PID {servicio['pid']}{', supervisado' if supervisor else ''})"
+    elif supervisor and supervisor.get('estado') == 'reiniciando':
+        texto = f"Reiniciando (intento {supervisor.get('reinicios')}, {supervisor.get('proximo_intento')})"
+    else:
+        texto = "Detenido"
+    print(f"Estado:          {texto}")
+    print(f"Avisos:          {datos.get('contador_avisos', 0)} (último: {datos.get('ultimo_aviso') or '---'})")
+    proximo = datos.get('proximo')
+    if servicio['vivo'] and proximo:
+        print(f"Próximo:         {proximo['hora']} ({proximo['nombre']})")
+    if 'recordatorios' in datos:
+        print(f"Recordatorios:   {datos['recordatorios']}")
+    metricas = datos.get('metricas') or {}
+    if metricas.get('entrega_p50') is not None:
+        print(f"Entrega p50/p95: {metricas['entrega_p50'] * 1000:.0f} / {metricas['entrega_p95'] * 1000:.0f} ms")
+    return 0 if servicio['vivo'] else 1
+
+
+def detener():
+    """--stop: por IPC o, si no hay canal, con la señal en status.json"""
+    respuesta = enviar_comando('detener', timeout=IPC_TIMEOUT)
+    if respuesta and respuesta.get('ok'):
+        print("Detención solicitada")
+        return 0
+    try:
+        estado = leer_estado() or {}
+        estado['corriendo'] = False
+        escribir_json_atomico(STATUS_FILE, estado)
+    except OSError as e:
+        print(f"No se pudo pedir la detención: {str(e)}", file=sys.stderr)
+        return 1
+    if estado_servicio()['vivo']:
+        print("Detención pedida en status.json (el servicio la verá en un segundo)")
+    else:
+        print("El servicio no está corriendo; queda marcado como detenido")
+    return 0
+
+
+def fijar_intervalo(segundos):
+    """--set-interval: intervalo del recordatorio principal"""
+    respuesta = enviar_comando('intervalo', timeout=IPC_TIMEOUT, valor=segundos)
+    if respuesta and respuesta.get('ok'):
+        print(f"Intervalo actualizado a {segundos} segundos")
+        return 0
+    if respuesta:
+        print(f"Error: {respuesta.get('error')}", file=sys.stderr)
+        return 1
+    if not guardar_config_file(segundos):
+        print("No se pudo guardar la configuración", file=sys.stderr)
+        return 1
+    print(f"Intervalo guardado en config.json: {segundos} segundos")
+    return 0
+
+
+def emitir():
+    """--emit-now: necesita el canal IPC del servicio"""
+    respuesta = enviar_comando('emitir', timeout=IPC_TIMEOUT)
+    if respuesta and respuesta.get('ok'):
+        print("Aviso solicitado")
+        return 0
+    print("El servicio no responde por IPC; no se puede emitir un aviso", file=sys.stderr)
+    return 1
+
+
+def seguir_log(lineas=30, seguir=False):
+    """--tail: últimas líneas del log y, con -f, las nuevas a medida que llegan.
+
+    El seguimiento sólo lee los bytes agregados (LectorLog) y sobrevive a
+    rotaciones y truncados del archivo.
+    """
+    if sys.stdout is None:
+        # Exe sin consola lanzado sin una terminal a la que adjuntarse
+        return 1
+    lector = LectorLog(LOG_FILE, lineas)
+    leido = lector.leer_nuevas()
+    if leido:
+        sys.stdout.write(''.join(leido[1]))
+    elif not seguir:
+        print("No hay logs aún", file=sys.stderr)
+        return 1
+    sys.stdout.flush()
+    try:
+        while seguir:
+            time.sleep(TAIL_INTERVALO)
+            leido = lector.leer_nuevas()
+            if leido and leido[1]:
+                sys.stdout.write(''.join(leido[1]))
+                sys.stdout.flush()
+    except KeyboardInterrupt:
+        pass
+    return 0
@@ -0,0 +1,42 @@
+# -*- mode: python ; coding: utf-8 -*-
+# Build liviano para el modo --service (NSSM): sin Qt ni la ventana.
+# pyinstaller despertador-servicio.spec  ->  dist/despertador-servicio.exe
+# Es de consola: también sirve para los comandos (--status, --tail...) desde
+# scripts, que así esperan a que termine y reciben su código de salida.
+
+
+a = Analysis(
+    ['despertador.py'],
+    pathex=[],
+    binaries=[],
+    datas=[],
+    hiddenimports=['windows_toasts'],
+    hookspath=[],
+    hooksconfig={},
+    runtime_hooks=[],
+    excludes=['PyQt5', 'ventana', 'tkinter'],
+    noarchive=False,
+    optimize=0,
+)
+pyz = PYZ(a.pure)
+
+exe = EXE(
+    pyz,
+    a.scripts,
+    a.binaries,
+    a.datas,
+    [],
+    name='despertador-servicio',
+    debug=False,
+    bootloader_ignore_signals=False,
+    strip=False,
+    upx=True,
+    upx_exclude=[],
+    runtime_tmpdir=None,
+    console=True,
+    disable_windowed_traceback=False,
+    argv_emulation=False,
+    target_arch=None,
+    codesign_identity=None,
+    entitlements_file=None,
+)
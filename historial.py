@@ -0,0 +1,198 @@
+import sqlite3
+import time
+from datetime import datetime
+
+# Avisos emitidos a pedido (comando 'emitir'), sin recordatorio
+MANUAL = ''
+
+# Se conservan las filas de avisos de este período; los resúmenes, siempre
+HISTORIAL_MAX_DIAS = 365
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS avisos (
+    id INTEGER PRIMARY KEY,
+    numero INTEGER NOT NULL,
+    recordatorio TEXT NOT NULL,
+    programado REAL,
+    emitido REAL NOT NULL,
+    ok INTEGER NOT NULL,
+    latencia REAL NOT NULL,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS avisos_emitido ON avisos (emitido);
+"""
+
+# Un resumen por período ('YYYY-MM-DD' o 'YYYY-MM-DD HH') y recordatorio
+ESQUEMA_RESUMEN = """
+CREATE TABLE IF NOT EXISTS {tabla} (
+    periodo TEXT NOT NULL,
+    recordatorio TEXT NOT NULL,
+    avisos INTEGER NOT NULL DEFAULT 0,
+    fallidos INTEGER NOT NULL DEFAULT 0,
+    omitidos INTEGER NOT NULL DEFAULT 0,
+    latencia_total REAL NOT NULL DEFAULT 0,
+    latencia_max REAL NOT NULL DEFAULT 0,
+    retraso_total REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (periodo, recordatorio)
+);
+"""
+
+# Tabla de resumen -> formato strftime del período
+RESUMENES = {
+    'resumen_dia': '%Y-%m-%d',
+    'resumen_hora': '%Y-%m-%d %H',
+}
+
+SUMAR_AVISO = """
+INSERT INTO {tabla} (periodo, recordatorio, avisos, fallidos, latencia_total, latencia_max, retraso_total)
+VALUES (?, ?, 1, ?, ?, ?, ?)
+ON CONFLICT (periodo, recordatorio) DO UPDATE SET
+    avisos = avisos + 1,
+    fallidos = fallidos + excluded.fallidos,
+    latencia_total = latencia_total + excluded.latencia_total,
+    latencia_max = MAX(latencia_max, excluded.latencia_max),
+    retraso_total = retraso_total + excluded.retraso_total
+"""
+
+SUMAR_OMITIDOS = """
+INSERT INTO {tabla} (periodo, recordatorio, omitidos) VALUES (?, ?, ?)
+ON CONFLICT (periodo, recordatorio) DO UPDATE SET omitidos = omitidos + excluded.omitidos
+"""
+
+
+class HistorialAvisos:
+    """Historial de avisos en SQLite (modo WAL) con resúmenes por día y por hora.
+
+    Cada aviso es una fila de 'avisos' y, en la misma transacción, suma en
+    los resúmenes de su día y su hora; así las estadísticas se leen de unas
+    pocas filas, sin recorrer el historial ni el log. WAL deja que la GUI
+    lea mientras el servicio escribe. Cada hilo o proceso usa su propia
+    instancia (la conexión se abre al primer uso).
+    """
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self._conexion = None
+
+    def _conectar(self):
+        if self._conexion is None:
+            conexion = sqlite3.connect(str(self.ruta), timeout=5.0)
+            conexion.row_factory = sqlite3.Row
+            conexion.execute("PRAGMA journal_mode=WAL")
+            # Con WAL, NORMAL no arriesga corrupción; sólo la última transacción ante un corte
+            conexion.execute("PRAGMA synchronous=NORMAL")
+            with conexion:
+                conexion.executescript(ESQUEMA + ''.join(
+                    ESQUEMA_RESUMEN.format(tabla=tabla) for tabla in RESUMENES))
+            self._conexion = conexion
+        return self._conexion
+
+    def cerrar(self):
+        if self._conexion is not None:
+            self._conexion.close()
+            self._conexion = None
+
+    def registrar(self, numero, recordatorio, emitido, ok, latencia, programado=None, error=None):
+        """Guarda un aviso y lo suma a los resúmenes (instantes en timestamp de pared).
+
+        El retraso se guarda con signo: un aviso adelantado para agruparlo
+        con otro resta, en lugar de contar como puntual.
+        """
+        retraso = emitido - programado if programado is not None else 0.0
+        conexion = self._conectar()
+        with conexion:
+            conexion.execute(
+                "INSERT INTO avisos (numero, recordatorio, programado, emitido, ok, latencia, error)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (numero, recordatorio, programado, emitido, int(ok), latencia, error))
+            momento = datetime.fromtimestamp(emitido)
+            for tabla, formato in RESUMENES.items():
+                conexion.execute(SUMAR_AVISO.format(tabla=tabla), (
+                    momento.strftime(formato), recordatorio, 0 if ok else 1, latencia, latencia, retraso))
+
+    def registrar_omitidos(self, recordatorio, cantidad, momento):
+        """Suma avisos salteados (atrasados tras una suspensión) a los resúmenes"""
+        conexion = self._conectar()
+        momento = datetime.fromtimestamp(momento)
+        with conexion:
+            for tabla, formato in RESUMENES.items():
+                conexion.execute(SUMAR_OMITIDOS.format(tabla=tabla),
+                                 (momento.strftime(formato), recordatorio, cantidad))
+
+    def ultimo_numero(self):
+        """Número del último aviso registrado (0 si no hay ninguno)"""
+        fila = self._conectar().execute("SELECT MAX(numero) FROM avisos").fetchone()
+        return fila[0] or 0
+
+    def resumen(self, tabla='resumen_dia', desde=None, recordatorio=None):
+        """Totales por período desde el período indicado (incluido), del más viejo al más nuevo.
+
+        Sin recordatorio se suman todos. Cada fila trae avisos, fallidos,
+        omitidos, tasa_fallos, latencia_media, latencia_max y retraso_medio.
+        """
+        if tabla not in RESUMENES:
+            raise ValueError(f"Resumen desconocido: {tabla}")
+        condiciones, parametros = [], []
+        if desde is not None:
+            condiciones.append("periodo >= ?")
+            parametros.append(desde)
+        if recordatorio is not None:
+            condiciones.append("recordatorio = ?")
+            parametros.append(recordatorio)
+        where = f"WHERE {' AND '.join(condiciones)}" if condiciones else ""
+        filas = self._conectar().execute(
+            f"SELECT periodo, SUM(avisos) AS avisos, SUM(fallidos) AS fallidos,"
+            f" SUM(omitidos) AS omitidos, SUM(latencia_total) AS latencia_total,"
+            f" MAX(latencia_max) AS latencia_max, SUM(retraso_total) AS retraso_total"
+            f" FROM {tabla} {where} GROUP BY periodo ORDER BY periodo", parametros)
+        return [_totales(fila) for fila in filas]
+
+    def resumen_dias(self, dias=7, ahora=None):
+        """Resumen diario de los últimos días (hoy incluido); ahora es un timestamp de pared"""
+        ahora = time.time() if ahora is None else ahora
+        desde = time.strftime('%Y-%m-%d', time.localtime(ahora - (dias - 1) * 86400))
+        return self.resumen('resumen_dia', desde)
+
+    def resumen_horas(self, horas=24, ahora=None):
+        """Resumen por hora de las últimas horas (la actual incluida)"""
+        ahora = time.time() if ahora is None else ahora
+        desde = time.strftime('%Y-%m-%d %H', time.localtime(ahora - (horas - 1) * 3600))
+        return self.resumen('resumen_hora', desde)
+
+    def purgar(self, dias=HISTORIAL_MAX_DIAS, ahora=None):
+        """Borra las filas de avisos más viejas que dias; devuelve cuántas borró.
+
+        ahora es el timestamp de pared del reloj de quien llama (en una
+        simulación, el virtual: los avisos se guardan con esa hora).
+        """
+        ahora = time.time() if ahora is None else ahora
+        conexion = self._conectar()
+        with conexion:
+            cursor = conexion.execute("DELETE FROM avisos WHERE emitido < ?", (ahora - dias * 86400,))
+        return cursor.rowcount
+
+
+def _totales(fila):
+    avisos = fila['avisos']
+    return {
+        'periodo': fila['periodo'],
+        'avisos': avisos,
+        'fallidos': fila['fallidos'],
+        'omitidos': fila['omitidos'],
+        'tasa_fallos': fila['fallidos'] / avisos if avisos else 0.0,
+        'latencia_media': fila['latencia_total'] / avisos if avisos else None,
+        'latencia_max': fila['latencia_max'],
+        'retraso_medio': fila['retraso_total'] / avisos if avisos else None,
+    }
+
+
+def sumar(filas):
+    """Junta varias filas de resumen en una (p. ej. los últimos 7 días)"""
+    avisos = sum(f['avisos'] for f in filas)
+    fallidos = sum(f['fallidos'] for f in filas)
+    return {
+        'avisos': avisos,
+        'fallidos': fallidos,
+        'omitidos': sum(f['omitidos'] for f in filas),
+        'tasa_fallos': fallidos / avisos if avisos else 0.0,
+    }
@@ -0,0 +1,322 @@
+import heapq
+import itertools
+import math
+from datetime import datetime, timedelta
+
+# Nombre del recordatorio que reemplaza al 'intervalo' global de config.json
+PRINCIPAL = 'principal'
+
+DIAS_SEMANA = ['Lun', 'Mar', 'Mié', 'Jue', 'Vie', 'Sáb', 'Dom']
+DIAS_LABORABLES = [0, 1, 2, 3, 4]
+
+# Tope de compactación: el heap se reconstruye si acumula más entradas
+# obsoletas que válidas (ver Planificador._programar)
+HEAP_MARGEN = 64
+
+
+def _minutos(texto):
+    """'HH:MM' -> minutos desde la medianoche"""
+    try:
+        horas, minutos = texto.split(':')
+        horas, minutos = int(horas), int(minutos)
+    except (AttributeError, ValueError):
+        raise ValueError(f"Hora inválida: {texto!r} (se espera HH:MM)")
+    if not (0 <= horas < 24 and 0 <= minutos < 60):
+        raise ValueError(f"Hora inválida: {texto!r} (se espera HH:MM)")
+    return horas * 60 + minutos
+
+
+def _a_momento(fecha, minutos):
+    return datetime(fecha.year, fecha.month, fecha.day, minutos // 60, minutos % 60)
+
+
+class Recordatorio:
+    """Un aviso programado: cada N segundos o a una hora fija del día.
+
+    Opcionalmente sólo ciertos días de la semana (0 = lunes) y con ventanas
+    de pausa "HH:MM-HH:MM" en las que no se avisa; una ventana puede cruzar
+    la medianoche ("22:00-07:00").
+    """
+
+    def __init__(self, nombre, intervalo=None, hora=None, dias=None, pausas=(),
+                 mensaje=None, activo=True):
+        if not nombre or not isinstance(nombre, str):
+            raise ValueError("El recordatorio necesita un nombre")
+        if (intervalo is None) == (hora is None):
+            raise ValueError(f"'{nombre}': indicar 'intervalo' o 'hora' (sólo uno)")
+        if intervalo is not None and (isinstance(intervalo, bool)
+                                      or not isinstance(intervalo, (int, float)) or intervalo <= 0):
+            raise ValueError(f"'{nombre}': intervalo inválido: {intervalo!r}")
+        dias = sorted(set(range(7) if dias is None else dias))
+        if any(not isinstance(d, int) or not 0 <= d < 7 for d in dias):
+            raise ValueError(f"'{nombre}': días inválidos: {dias!r}")
+        self.nombre = nombre
+        self.intervalo = intervalo
+        self.hora = hora
+        self.minuto_hora = None if hora is None else _minutos(hora)
+        self.dias = dias
+        self.pausas = list(pausas)
+        self.ventanas = []
+        for pausa in self.pausas:
+            inicio, _, fin = str(pausa).partition('-')
+            inicio, fin = _minutos(inicio.strip()), _minutos(fin.strip())
+            if inicio == fin:
+                raise ValueError(f"'{nombre}': pausa vacía: {pausa!r}")
+            self.ventanas.append((inicio, fin))
+        self.mensaje = mensaje or None
+        self.activo = bool(activo)
+        # Los recordatorios no se modifican: se compara contra esta copia
+        self._datos = self.a_dict()
+
+    @classmethod
+    def desde_dict(cls, datos):
+        """Crea el recordatorio a partir de su entrada en config.json (ValueError si es inválida)"""
+        if not isinstance(datos, dict) or 'nombre' not in datos:
+            raise ValueError(f"Recordatorio inválido: {datos!r}")
+        claves = {'nombre', 'intervalo', 'hora', 'dias', 'pausas', 'mensaje', 'activo'}
+        try:
+            return cls(**{k: v for k, v in datos.items() if k in claves})
+        except TypeError:
+            raise ValueError(f"Recordatorio inválido: {datos!r}")
+
+    def a_dict(self):
+        """Entrada para config.json (sólo los campos con valor distinto del defecto)"""
+        datos = {'nombre': self.nombre}
+        if self.intervalo is not None:
+            datos['intervalo'] = self.intervalo
+        else:
+            datos['hora'] = self.hora
+        if self.dias != list(range(7)):
+            datos['dias'] = self.dias
+        if self.pausas:
+            datos['pausas'] = self.pausas
+        if self.mensaje:
+            datos['mensaje'] = self.mensaje
+        if not self.activo:
+            datos['activo'] = False
+        return datos
+
+    def __eq__(self, otro):
+        return isinstance(otro, Recordatorio) and self._datos == otro._datos
+
+    def describir(self):
+        """Resumen de una línea para la interfaz"""
+        if self.intervalo is not None:
+            texto = f"cada {self.intervalo:g}s"
+        else:
+            texto = f"a las {self.hora}"
+        if self.dias == DIAS_LABORABLES:
+            texto += ", lun a vie"
+        elif self.dias != list(range(7)):
+            texto += ", " + " ".join(DIAS_SEMANA[d] for d in self.dias)
+        if self.pausas:
+            texto += ", pausa " + ", ".join(self.pausas)
+        if not self.activo:
+            texto += " (inactivo)"
+        return texto
+
+    def _pausa(self, momento):
+        """Ventana de pausa que contiene al momento, o None"""
+        minuto = momento.hour * 60 + momento.minute
+        for inicio, fin in self.ventanas:
+            if inicio < fin and inicio <= minuto < fin:
+                return inicio, fin
+            if inicio > fin and (minuto >= inicio or minuto < fin):
+                return inicio, fin
+        return None
+
+    def permitido(self, momento):
+        """True si el recordatorio puede avisar en ese momento (datetime local)"""
+        return momento.weekday() in self.dias and self._pausa(momento) is None
+
+    def proximo_permitido(self, momento):
+        """Primer instante >= momento en que se puede avisar, o None si nunca"""
+        if not self.dias:
+            return None
+        # Cada vuelta salta un día vedado o una pausa entera
+        for _ in range(8 * (len(self.ventanas) + 2)):
+            if momento.weekday() not in self.dias:
+                momento = _a_momento(momento.date() + timedelta(days=1), 0)
+                continue
+            pausa = self._pausa(momento)
+            if pausa is None:
+                return momento
+            inicio, fin = pausa
+            fecha = momento.date()
+            if inicio > fin and momento.hour * 60 + momento.minute >= inicio:
+                fecha += timedelta(days=1)
+            momento = _a_momento(fecha, fin)
+        return None
+
+    def siguiente(self, pared):
+        """Próximo disparo posterior a pared (timestamp), o None si nunca.
+
+        Con intervalo es pared + intervalo, corrido a la primera repetición
+        permitida (se mantiene la fase); con hora fija, la próxima ocurrencia
+        de esa hora en un día y fuera de pausa permitidos.
+        """
+        if self.intervalo is not None:
+            return self.ajustar(pared + self.intervalo)
+        momento = datetime.fromtimestamp(pared)
+        candidato = _a_momento(momento.date(), self.minuto_hora)
+        if candidato <= momento:
+            candidato += timedelta(days=1)
+        for _ in range(8):
+            if self.permitido(candidato):
+                return candidato.timestamp()
+            candidato += timedelta(days=1)
+        return None
+
+    def ajustar(self, pared):
+        """Corre un plazo de intervalo hasta la primera repetición permitida"""
+        if self.intervalo is None:
+            return pared
+        for _ in range(8 * (len(self.ventanas) + 2)):
+            momento = datetime.fromtimestamp(pared)
+            permitido = self.proximo_permitido(momento)
+            if permitido is None:
+                return None
+            if permitido == momento:
+                return pared
+            pared += math.ceil((permitido.timestamp() - pared) / self.intervalo) * self.intervalo
+        return None
+
+
+def recordatorios_de_config(config, intervalo_defecto):
+    """Definiciones de recordatorios de config.json.
+
+    Sin lista 'recordatorios', el 'intervalo' global de versiones anteriores
+    se convierte en el recordatorio PRINCIPAL (intervalo_defecto si es inválido).
+    """
+    lista = config.get('recordatorios')
+    if isinstance(lista, list):
+        return lista
+    intervalo = config.get('intervalo', intervalo_defecto)
+    if isinstance(intervalo, bool) or not isinstance(intervalo, (int, float)) or intervalo <= 0:
+        intervalo = intervalo_defecto
+    return [{'nombre': PRINCIPAL, 'intervalo': intervalo}]
+
+
+class Planificador:
+    """Próximo disparo de todos los recordatorios, en un heap por plazo.
+
+    Los plazos son del reloj monotónico del servicio; las horas fijas, días
+    y pausas se calculan sobre el reloj de pared y se convierten con el
+    desfase entre ambos. Reprogramar o quitar un recordatorio no busca su
+    entrada vieja en el heap: queda obsoleta (no coincide con plazos) y se
+    descarta al salir, así cada operación es O(log n).
+    """
+
+    def __init__(self):
+        self.recordatorios = {}   # nombre -> Recordatorio
+        self.plazos = {}          # nombre -> (plazo, secuencia) de su entrada vigente
+        self.ultimos = {}         # nombre -> último disparo (monotónico)
+        self.heap = []            # (plazo, secuencia, nombre)
+        self._secuencia = itertools.count()
+
+    def __len__(self):
+        return len(self.plazos)
+
+    def aplicar(self, recordatorios, ahora_mono, ahora_pared):
+        """Aplica una configuración nueva tocando sólo lo que cambió.
+
+        Devuelve (agregados, quitados, modificados) con los nombres. Un
+        intervalo modificado se reprograma desde su último disparo (o ya
+        mismo, si ese plazo quedó en el pasado).
+        """
+        nuevos = {r.nombre: r for r in recordatorios}
+        quitados = [n for n in self.recordatorios if n not in nuevos]
+        agregados, modificados = [], []
+        for nombre in quitados:
+            del self.recordatorios[nombre]
+            self.ultimos.pop(nombre, None)
+            self._programar(nombre, None)
+        for nombre, recordatorio in nuevos.items():
+            anterior = self.recordatorios.get(nombre)
+            if anterior == recordatorio:
+                continue
+            self.recordatorios[nombre] = recordatorio
+            if anterior is None:
+                agregados.append(nombre)
+                self.ultimos[nombre] = ahora_mono
+            else:
+                modificados.append(nombre)
+            # Una hora fija se busca desde ahora; un intervalo, desde su último disparo
+            desde = self.ultimos[nombre] if recordatorio.intervalo is not None else ahora_mono
+            self._reprogramar(nombre, desde, ahora_mono, ahora_pared)
+            plazo = self.plazos.get(nombre, (None,))[0]
+            if plazo is not None and plazo < ahora_mono and recordatorio.intervalo is not None:
+                self._programar(nombre, self._a_mono(
+                    recordatorio.ajustar(ahora_pared), ahora_mono, ahora_pared))
+        return agregados, quitados, modificados
+
+    def proximo(self):
+        """(plazo, nombre) del próximo disparo, o None si no hay ninguno"""
+        while self.heap:
+            plazo, secuencia, nombre = self.heap[0]
+            if self.plazos.get(nombre) == (plazo, secuencia):
+                return plazo, nombre
+            heapq.heappop(self.heap)
+        return None
+
+    def disparar(self, nombre, ahora_mono, ahora_pared):
+        """Reprograma un recordatorio que acaba de avisar.
+
+        Devuelve cuántos plazos posteriores ya vencidos se saltearon
+        (suspensión, notificación lenta), manteniendo la fase.
+        """
+        plazo = self.plazos[nombre][0]
+        recordatorio = self.recordatorios[nombre]
+        self.ultimos[nombre] = plazo
+        if recordatorio.intervalo is not None:
+            intervalo = recordatorio.intervalo
+            atrasados = max(0, int((ahora_mono - plazo) // intervalo))
+            if atrasados:
+                self.ultimos[nombre] = plazo + atrasados * intervalo
+            self._reprogramar(nombre, self.ultimos[nombre], ahora_mono, ahora_pared)
+            return atrasados
+        atrasados = 0
+        self._reprogramar(nombre, plazo, ahora_mono, ahora_pared)
+        while self.plazos.get(nombre, (math.inf,))[0] <= ahora_mono:
+            atrasados += 1
+            self._reprogramar(nombre, self.plazos[nombre][0], ahora_mono, ahora_pared)
+        return atrasados
+
+    def desplazar(self, salto, ahora_mono, ahora_pared):
+        """Corrige los plazos tras un salto del reloj de pared.
+
+        Si el reloj de pared adelantó (suspensión), todos los plazos se
+        adelantan lo mismo; si atrasó, sólo los de hora fija, que siguen a
+        la hora de pared.
+        """
+        for nombre, (plazo, _) in list(self.plazos.items()):
+            if salto > 0 or self.recordatorios[nombre].hora is not None:
+                self._programar(nombre, plazo - salto)
+
+    def siguientes(self, ahora_mono, ahora_pared):
+        """{nombre: timestamp de pared del próximo disparo} de los programados"""
+        return {nombre: ahora_pared + plazo - ahora_mono
+                for nombre, (plazo, _) in self.plazos.items()}
+
+    def _a_mono(self, pared, ahora_mono, ahora_pared):
+        return None if pared is None else ahora_mono + (pared - ahora_pared)
+
+    def _reprogramar(self, nombre, desde, ahora_mono, ahora_pared):
+        """Programa el disparo siguiente a desde (monotónico)"""
+        recordatorio = self.recordatorios[nombre]
+        if not recordatorio.activo:
+            self._programar(nombre, None)
+            return
+        pared = recordatorio.siguiente(ahora_pared + desde - ahora_mono)
+        self._programar(nombre, self._a_mono(pared, ahora_mono, ahora_pared))
+
+    def _programar(self, nombre, plazo):
+        if plazo is None:
+            self.plazos.pop(nombre, None)
+        else:
+            secuencia = next(self._secuencia)
+            self.plazos[nombre] = (plazo, secuencia)
+            heapq.heappush(self.heap, (plazo, secuencia, nombre))
+        if len(self.heap) > 2 * len(self.plazos) + HEAP_MARGEN:
+            self.heap = [(p, s, n) for n, (p, s) in self.plazos.items()]
+            heapq.heapify(self.heap)
@@ -0,0 +1,51 @@
+"""Fuentes de tiempo del servicio.
+
+Módulo aparte y sin efectos al importarlo (servicio crea la carpeta de
+datos al importarse): la simulación y los benchmarks definen sus relojes
+antes de elegir esa carpeta.
+"""
+import threading
+import time
+
+
+class Reloj:
+    """Fuente de tiempo del servicio; se puede reemplazar en pruebas"""
+
+    def monotonico(self):
+        return time.monotonic()
+
+    def pared(self):
+        return time.time()
+
+    def esperar(self, evento, timeout):
+        """Espera hasta que se active el evento o pase timeout; True si se activó"""
+        return evento.wait(timeout)
+
+
+class RelojVirtual(Reloj):
+    """Reloj simulado: esperar() adelanta el tiempo en lugar de dormir.
+
+    Permite correr miles de ciclos del servicio en segundos (benchmarks y
+    simulaciones). avanzar() simula tiempo consumido por el trabajo.
+    """
+
+    def __init__(self, inicio=None):
+        self.transcurrido = 0.0
+        self.inicio = time.time() if inicio is None else inicio
+        self._lock = threading.Lock()
+
+    def monotonico(self):
+        return self.transcurrido
+
+    def pared(self):
+        return self.inicio + self.transcurrido
+
+    def avanzar(self, segundos):
+        with self._lock:
+            self.transcurrido += segundos
+
+    def esperar(self, evento, timeout):
+        if evento.is_set():
+            return True
+        self.avanzar(timeout)
+        return evento.is_set()
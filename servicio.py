@@ -0,0 +1,2011 @@
+import abc
+import sys
+import os
+import json
+import math
+import gzip
+import time
+import queue
+import signal
+import atexit
+import socket
+import secrets
+import sqlite3
+import subprocess
+import bisect
+import threading
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+
+from reloj import Reloj
+from recordatorios import PRINCIPAL, Recordatorio, Planificador, recordatorios_de_config
+from historial import MANUAL, HistorialAvisos
+
+# Configuración
+# En Windows los datos van en %APPDATA%; fuera de Windows (pruebas, benchmarks)
+# en ~/.config. DESPERTADOR_DIR permite usar otra carpeta.
+if os.getenv('DESPERTADOR_DIR'):
+    APP_DATA_DIR = Path(os.getenv('DESPERTADOR_DIR'))
+else:
+    APP_DATA_DIR = Path(os.getenv('APPDATA') or Path.home() / '.config') / 'despertador'
+LOG_FILE = APP_DATA_DIR / 'app.log'
+STATUS_FILE = APP_DATA_DIR / 'status.json'
+CONFIG_FILE = APP_DATA_DIR / 'config.json'
+LOGS_DIR = APP_DATA_DIR / 'logs'
+IPC_FILE = APP_DATA_DIR / 'ipc.json'
+IPC_SOCKET = APP_DATA_DIR / 'ipc.sock'
+METRICS_FILE = APP_DATA_DIR / 'metricas.json'
+METRICS_PROM_FILE = APP_DATA_DIR / 'metricas.prom'
+HISTORY_FILE = APP_DATA_DIR / 'historial.db'
+LOCK_FILE = APP_DATA_DIR / 'servicio.lock'
+HEARTBEAT_FILE = APP_DATA_DIR / 'latido.json'
+SUPERVISOR_LOCK_FILE = APP_DATA_DIR / 'supervisor.lock'
+SUPERVISOR_FILE = APP_DATA_DIR / 'supervisor.json'
+
+# Rotación del log: se archiva app.log al superar este tamaño o antigüedad
+LOG_MAX_BYTES = 1024 * 1024
+LOG_MAX_EDAD = 24 * 3600
+LOG_MAX_SEGMENTOS = 180
+
+# Escritura asíncrona del log
+LOG_COLA_MAX = 10000          # líneas en espera antes de descartar
+LOG_LOTE_MAX = 500            # líneas por escritura
+LOG_FLUSH_INTERVALO = 0.2     # segundos que se espera para juntar un lote
+LOG_MUESTREO = 10             # con la cola casi llena se guarda 1 de cada N líneas
+
+# Loop del servicio
+INTERVALO_DEFECTO = 30
+VIGILANCIA_INTERVALO = 1.0   # cada cuánto se revisan config.json y status.json
+ESPERA_MAXIMA = 60.0         # tope de cada espera, para notar saltos del reloj
+UMBRAL_SALTO_RELOJ = 5.0     # diferencia entre reloj de pared y monotónico
+
+# IPC
+IPC_ENVIO_TIMEOUT = 1.0      # un suscripto que no lee eventos por este tiempo se descarta
+IPC_RESPUESTA_TIMEOUT = 5.0  # espera de un comando que tiene que atender el loop
+
+# Notificaciones
+NOTIFICACION_TIMEOUT = 10.0  # segundos máximos por entrega
+
+# Agrupación y límite de notificaciones (clave 'entrega' de config.json)
+ENTREGA_RAFAGA = 3           # notificaciones seguidas que se permiten
+ENTREGA_POR_MINUTO = 6.0     # ritmo al que se recupera la ráfaga; 0 desactiva el límite
+ENTREGA_VENTANA = 2.0        # avisos que vencen dentro de estos segundos salen juntos
+ENTREGA_RECUPERACION = 'uno' # qué hacer con los avisos atrasados (ver RECUPERACIONES)
+ATRASO_MAXIMO = 60.0         # un aviso más atrasado que esto es de recuperación (suspensión)
+
+# Avisos atrasados tras un hueco: 'uno' entrega uno por recordatorio y omite
+# el resto, 'resumen' además cuenta los omitidos en la notificación y
+# 'ninguno' no notifica los que pasaron ATRASO_MAXIMO
+RECUPERACIONES = ('uno', 'resumen', 'ninguno')
+
+# Métricas
+METRICAS_INTERVALO = 60.0    # cada cuánto se exportan a metricas.json / metricas.prom
+
+# Instancia única y supervisor
+LATIDO_INTERVALO = 5.0       # cada cuánto el servicio renueva latido.json
+LATIDO_VENCIDO = 15.0        # un latido más viejo que esto es de un proceso muerto o colgado
+REINICIO_MIN = 1.0           # primera espera antes de reiniciar el servicio caído
+REINICIO_MAX = 300.0         # las esperas se duplican hasta este tope
+REINICIO_ESTABLE = 60.0      # si el servicio corrió esto sin caerse, la espera vuelve al mínimo
+REINICIO_GRACIA = 30.0       # margen de arranque antes de exigirle latidos
+SALIDA_OTRA_INSTANCIA = 3    # código de salida cuando ya hay otro servicio corriendo
+SALIDA_TERMINADO = 143       # terminado por señal sin pedido de detención (el supervisor reinicia)
+
+# Crear directorio si no existe
+APP_DATA_DIR.mkdir(parents=True, exist_ok=True)
+
+class VigilanteArchivos:
+    """Hilo que revisa el mtime/tamaño de archivos y avisa cuando cambian"""
+
+    def __init__(self, rutas, al_cambiar, intervalo=VIGILANCIA_INTERVALO):
+        self.rutas = [Path(r) for r in rutas]
+        self.al_cambiar = al_cambiar
+        self.intervalo = intervalo
+        self._fin = threading.Event()
+        self._firmas = {ruta: self._firma(ruta) for ruta in self.rutas}
+
+    def _firma(self, ruta):
+        try:
+            st = os.stat(ruta)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def iniciar(self):
+        threading.Thread(target=self._vigilar, daemon=True).start()
+
+    def detener(self):
+        self._fin.set()
+
+    def _vigilar(self):
+        while not self._fin.wait(self.intervalo):
+            for ruta in self.rutas:
+                firma = self._firma(ruta)
+                if firma != self._firmas[ruta]:
+                    self._firmas[ruta] = firma
+                    try:
+                        self.al_cambiar(ruta)
+                    except Exception:
+                        pass
+
+
+class Notificador(abc.ABC):
+    """Backend de notificaciones: muestra un aviso con título y cuerpo"""
+
+    nombre = 'base'
+
+    @abc.abstractmethod
+    def enviar(self, titulo, cuerpo):
+        """Muestra el aviso; una excepción cuenta como entrega fallida"""
+
+
+class NotificadorWindows(Notificador):
+    """Toast de Windows; el toaster se crea una vez y se reutiliza"""
+
+    nombre = 'windows'
+
+    def __init__(self):
+        from windows_toasts import WindowsToaster, Toast
+        self._toast = Toast
+        self.toaster = WindowsToaster(applicationText="Despertador")
+
+    def enviar(self, titulo, cuerpo):
+        toast = self._toast()
+        toast.text_fields = [titulo, cuerpo]
+        self.toaster.show_toast(toast)
+
+
+class NotificadorConsola(Notificador):
+    """Escribe cada notificación en la salida estándar o en un archivo"""
+
+    nombre = 'consola'
+
+    def __init__(self, archivo=None):
+        self.archivo = archivo
+
+    def enviar(self, titulo, cuerpo):
+        linea = f"[NOTIFICACION] {titulo} - {cuerpo}"
+        if self.archivo is None:
+            print(linea, flush=True)
+        else:
+            with open(self.archivo, 'a', encoding='utf-8') as f:
+                f.write(linea + '\n')
+
+
+class NotificadorMemoria(Notificador):
+    """Guarda las notificaciones en una lista (pruebas, benchmarks y simulaciones).
+
+    Con un reloj (virtual) anota además el instante monotónico de cada
+    entrega y simula su demora adelantándolo. al_enviar(n) se llama después
+    de la n-ésima entrega, p. ej. para terminar el loop.
+    """
+
+    nombre = 'memoria'
+
+    def __init__(self, reloj=None, demora=0.0, al_enviar=None):
+        self.reloj = reloj
+        self.demora = demora
+        self.al_enviar = al_enviar
+        self.enviadas = []
+        self.instantes = []
+
+    def enviar(self, titulo, cuerpo):
+        self.enviadas.append((titulo, cuerpo))
+        if self.reloj is not None:
+            self.instantes.append(self.reloj.monotonico())
+            if self.demora:
+                self.reloj.avanzar(self.demora)
+        if self.al_enviar is not None:
+            self.al_enviar(len(self.enviadas))
+
+
+NOTIFICADORES = {
+    'windows': NotificadorWindows,
+    'consola': NotificadorConsola,
+    'memoria': NotificadorMemoria,
+}
+
+def crear_notificador(nombre=None):
+    """Crea el backend pedido, el de DESPERTADOR_NOTIFICADOR / config.json, o el del sistema.
+
+    "archivo:<ruta>" crea un NotificadorConsola que agrega los avisos a <ruta>.
+    """
+    nombre = (nombre or os.getenv('DESPERTADOR_NOTIFICADOR') or leer_config().get('notificador')
+              or ('windows' if sys.platform == 'win32' else 'consola'))
+    # partition y no split: la ruta puede traer ":" (C:\...)
+    tipo, _, ruta = nombre.partition(':')
+    if tipo == 'archivo':
+        if not ruta:
+            raise ValueError("Falta la ruta del notificador: archivo:<ruta>")
+        return NotificadorConsola(archivo=ruta)
+    if ruta or nombre not in NOTIFICADORES:
+        raise ValueError(f"Notificador desconocido: {nombre}")
+    return NOTIFICADORES[nombre]()
+
+
+class DespachadorNotificaciones:
+    """Entrega notificaciones desde un hilo de trabajo con timeout por entrega.
+
+    El backend se crea una sola vez, dentro del hilo de trabajo, y se
+    reutiliza. Si una entrega no termina en el plazo, ese hilo se abandona
+    y la siguiente usa un hilo y un backend nuevos, así un backend colgado
+    no frena el loop del servicio.
+    """
+
+    _FIN = object()
+
+    def __init__(self, fabrica=crear_notificador, timeout=NOTIFICACION_TIMEOUT):
+        self.fabrica = fabrica
+        self.timeout = timeout
+        self.entregadas = 0
+        self.fallidas = 0
+        self.ultima = None
+        self._cola = None
+        self._lock = threading.Lock()
+
+    def enviar(self, titulo, cuerpo, timeout=None):
+        """Entrega y espera el resultado: {'ok', 'latencia' (segundos), 'error'}"""
+        timeout = self.timeout if timeout is None else timeout
+        pedido = {'titulo': titulo, 'cuerpo': cuerpo,
+                  'listo': threading.Event(), 'resultado': None}
+        with self._lock:
+            if self._cola is None:
+                self._cola = queue.Queue()
+                threading.Thread(target=self._trabajar, args=(self._cola,), daemon=True).start()
+            cola = self._cola
+        cola.put(pedido)
+
+        if pedido['listo'].wait(timeout):
+            resultado = pedido['resultado']
+        else:
+            resultado = {'ok': False, 'latencia': timeout,
+                         'error': f'sin respuesta en {timeout:g}s'}
+            with self._lock:
+                if self._cola is cola:
+                    self._cola = None
+            # El hilo colgado termina cuando (y si) vuelve del backend
+            cola.put(self._FIN)
+
+        if resultado['ok']:
+            self.entregadas += 1
+        else:
+            self.fallidas += 1
+        self.ultima = resultado
+        return resultado
+
+    def _trabajar(self, cola):
+        backend = None
+        while True:
+            pedido = cola.get()
+            if pedido is self._FIN:
+                return
+            inicio = time.perf_counter()
+            try:
+                if backend is None:
+                    backend = self.fabrica()
+                backend.enviar(pedido['titulo'], pedido['cuerpo'])
+                resultado = {'ok': True, 'error': None}
+            except Exception as e:
+                backend = None
+                resultado = {'ok': False, 'error': str(e)}
+            resultado['latencia'] = time.perf_counter() - inicio
+            pedido['resultado'] = resultado
+            pedido['listo'].set()
+
+
+class LimitadorAvisos:
+    """Junta los avisos pendientes y limita las notificaciones con un token bucket.
+
+    Cada notificación gasta una ficha y las fichas se recargan a por_minuto
+    hasta rafaga. Sin fichas los avisos esperan; cuando hay una, todos los
+    pendientes salen en una sola notificación agrupada, así una ráfaga de N
+    avisos cuesta una entrega y no N. Los instantes son del reloj monotónico.
+    """
+
+    def __init__(self, rafaga=ENTREGA_RAFAGA, por_minuto=ENTREGA_POR_MINUTO, ventana=ENTREGA_VENTANA):
+        self.pendientes = []
+        self.fichas = None
+        self.actualizado = None
+        self.configurar(rafaga, por_minuto, ventana)
+
+    def configurar(self, rafaga, por_minuto, ventana):
+        self.rafaga = rafaga
+        self.por_minuto = por_minuto
+        self.ventana = ventana
+        if self.fichas is not None:
+            self.fichas = min(self.fichas, rafaga)
+
+    def _recargar(self, ahora):
+        if self.fichas is None:
+            self.fichas = float(self.rafaga)
+        else:
+            self.fichas = min(self.rafaga, self.fichas + (ahora - self.actualizado) * self.por_minuto / 60)
+        self.actualizado = ahora
+
+    def agregar(self, aviso):
+        self.pendientes.append(aviso)
+
+    def tomar(self, ahora, forzar=False):
+        """Los pendientes a entregar ahora en una notificación ([] si no hay, o no hay ficha)"""
+        if not self.pendientes:
+            return []
+        if self.por_minuto and not forzar:
+            self._recargar(ahora)
+            # Tolerancia: esperar proxima_entrega() justo debe alcanzar
+            if self.fichas < 1 - 1e-9:
+                return []
+            self.fichas -= 1
+        lote, self.pendientes = self.pendientes, []
+        return lote
+
+    def proxima_entrega(self, ahora):
+        """Instante en que se podrán entregar los pendientes (inf si no hay)"""
+        if not self.pendientes:
+            return math.inf
+        if not self.por_minuto:
+            return ahora
+        self._recargar(ahora)
+        return ahora + max(0.0, (1 - self.fichas) * 60 / self.por_minuto)
+
+
+def config_entrega(config):
+    """(rafaga, por_minuto, ventana, recuperacion) de la clave 'entrega'; ValueError si es inválida"""
+    entrega = config.get('entrega') or {}
+    if not isinstance(entrega, dict):
+        raise ValueError("'entrega' debe ser un objeto")
+    try:
+        rafaga = int(entrega.get('rafaga', ENTREGA_RAFAGA))
+        por_minuto = float(entrega.get('por_minuto', ENTREGA_POR_MINUTO))
+        ventana = float(entrega.get('ventana', ENTREGA_VENTANA))
+    except (TypeError, ValueError):
+        raise ValueError("'rafaga', 'por_minuto' y 'ventana' deben ser números")
+    recuperacion = entrega.get('recuperacion', ENTREGA_RECUPERACION)
+    if rafaga < 1 or por_minuto < 0 or ventana < 0:
+        raise ValueError("'rafaga' debe ser al menos 1; 'por_minuto' y 'ventana', no negativos")
+    if recuperacion not in RECUPERACIONES:
+        raise ValueError(f"'recuperacion' debe ser una de: {', '.join(RECUPERACIONES)}")
+    return rafaga, por_minuto, ventana, recuperacion
+
+
+class Histograma:
+    """Histograma de duraciones (segundos) con límites fijos, estilo Prometheus.
+
+    Registrar un valor es una búsqueda binaria y un incremento; los
+    percentiles se estiman interpolando dentro del bucket.
+    """
+
+    LIMITES = (0.001, 0.002, 0.005, 0.01, 0.02, 0.035, 0.05, 0.075, 0.1, 0.15,
+               0.2, 0.3, 0.5, 0.75, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+    def __init__(self, limites=LIMITES):
+        self.limites = limites
+        self.cuentas = [0] * (len(limites) + 1)
+        self.n = 0
+        self.suma = 0.0
+        self.maximo = 0.0
+
+    def observar(self, valor):
+        self.cuentas[bisect.bisect_left(self.limites, valor)] += 1
+        self.n += 1
+        self.suma += valor
+        if valor > self.maximo:
+            self.maximo = valor
+
+    def percentil(self, p):
+        """Estimación del percentil p (0-100), o None si no hay datos"""
+        if not self.n:
+            return None
+        objetivo = p / 100 * self.n
+        acumulado = 0
+        for i, cuenta in enumerate(self.cuentas):
+            if cuenta and acumulado + cuenta >= objetivo:
+                inferior = self.limites[i - 1] if i > 0 else 0.0
+                superior = self.limites[i] if i < len(self.limites) else self.maximo
+                fraccion = (objetivo - acumulado) / cuenta
+                return min(inferior + (superior - inferior) * fraccion, self.maximo)
+            acumulado += cuenta
+        return self.maximo
+
+    def resumen(self):
+        return {
+            'n': self.n,
+            'media': self.suma / self.n if self.n else None,
+            'p50': self.percentil(50),
+            'p95': self.percentil(95),
+            'max': self.maximo if self.n else None,
+        }
+
+
+class Metricas:
+    """Histogramas y contadores del servicio, en memoria y baratos de actualizar"""
+
+    def __init__(self):
+        self.histogramas = {}
+        self.contadores = {}
+        self.cambios = 0
+        self._lock = threading.Lock()
+
+    def observar(self, nombre, segundos):
+        with self._lock:
+            histograma = self.histogramas.get(nombre)
+            if histograma is None:
+                histograma = self.histogramas[nombre] = Histograma()
+            histograma.observar(segundos)
+            self.cambios += 1
+
+    def incrementar(self, nombre, cantidad=1):
+        with self._lock:
+            self.contadores[nombre] = self.contadores.get(nombre, 0) + cantidad
+            self.cambios += 1
+
+    def percentil(self, nombre, p):
+        histograma = self.histogramas.get(nombre)
+        return histograma.percentil(p) if histograma else None
+
+    def exportar(self):
+        """Métricas como dict serializable a JSON"""
+        with self._lock:
+            return {
+                'contadores': dict(self.contadores),
+                'histogramas': {nombre: h.resumen() for nombre, h in self.histogramas.items()},
+                'actualizado': datetime.now().isoformat(),
+            }
+
+    def texto_prometheus(self, prefijo='despertador'):
+        """Métricas en el formato de texto de Prometheus"""
+        lineas = []
+        with self._lock:
+            for nombre, valor in sorted(self.contadores.items()):
+                lineas.append(f"# TYPE {prefijo}_{nombre}_total counter")
+                lineas.append(f"{prefijo}_{nombre}_total {valor}")
+            for nombre, h in sorted(self.histogramas.items()):
+                metrica = f"{prefijo}_{nombre}_segundos"
+                lineas.append(f"# TYPE {metrica} histogram")
+                acumulado = 0
+                for limite, cuenta in zip(h.limites, h.cuentas):
+                    acumulado += cuenta
+                    lineas.append(f'{metrica}_bucket{{le="{limite:g}"}} {acumulado}')
+                lineas.append(f'{metrica}_bucket{{le="+Inf"}} {h.n}')
+                lineas.append(f"{metrica}_sum {h.suma:.6f}")
+                lineas.append(f"{metrica}_count {h.n}")
+        return '\n'.join(lineas) + '\n'
+
+
+class ServicioApp:
+    def __init__(self, reloj=None, notificador=None, latido=None):
+        self.reloj = reloj or Reloj()
+        self.notificador = notificador or DespachadorNotificaciones()
+        # Latido que renueva el loop (sólo en el proceso del servicio)
+        self.latido = latido
+        self.corriendo = True
+        # Terminar sin dejar pedida la detención (señal del sistema o del supervisor)
+        self.terminando = False
+        self.ultimo_aviso = None
+        self.contador_avisos = 0
+        # Despierta el loop ante comandos IPC (detener, intervalo, emitir)
+        self.despertar = threading.Event()
+        self.emitir_ahora = False
+        self.ipc = None
+        self.estado = GestorEstado(STATUS_FILE)
+        self.metricas = Metricas()
+        self._cambios_exportados = 0
+        self.planificador = Planificador()
+        # Pedidos IPC de la lista de recordatorios: los arma el loop, que es
+        # el único hilo que toca el planificador (ver pedir_recordatorios)
+        self._pedidos_lista = deque()
+        # Lista 'recordatorios' (o intervalo) de config.json ya aplicada
+        self._fuente_config = None
+        # Agrupación, límite de notificaciones y política de avisos atrasados
+        self.limitador = LimitadorAvisos()
+        self.recuperacion = ENTREGA_RECUPERACION
+        self._fuente_entrega = None
+        # El contador sigue desde el último aviso guardado en el historial
+        self.historial = HistorialAvisos(HISTORY_FILE)
+        try:
+            self.contador_avisos = self.historial.ultimo_numero()
+        except sqlite3.Error as e:
+            self.registrar_log(f"No se pudo leer el historial: {str(e)}")
+        # La conexión se vuelve a abrir en el hilo que la use
+        self.historial.cerrar()
+        # status.json lo escribe sólo el loop: la GUI también crea un
+        # ServicioApp y no debe pisar el estado del servicio que corre
+        
+    def registrar_log(self, mensaje):
+        """Escribe en el archivo de log, con la hora del reloj del servicio"""
+        registrar_log(mensaje, self.reloj.pared())
+    
+    def guardar_estado(self):
+        """Guarda estado actual en JSON para que la GUI lo pueda leer.
+
+        Se llama una vez por ciclo; si nada cambió no toca el disco.
+        """
+        # Verificar si hay señal de detención externa antes de escribir
+        try:
+            # Si en disco dice False, adoptamos ese estado
+            if self.estado.detencion_solicitada():
+                self.corriendo = False
+        except Exception:
+            pass
+
+        self.estado.actualizar(
+            corriendo=self.corriendo,
+            ultimo_aviso=self.ultimo_aviso,
+            contador_avisos=self.contador_avisos,
+            metricas=self.resumen_metricas(),
+            recordatorios=len(self.planificador),
+            proximo=self.resumen_proximo(),
+        )
+        inicio = time.perf_counter()
+        if self.estado.flush():
+            self.metricas.observar('escritura_estado', time.perf_counter() - inicio)
+
+    def resumen_metricas(self):
+        """Percentiles que muestra la GUI junto al último aviso (segundos)"""
+        return {
+            'entrega_p50': self.metricas.percentil('latencia_entrega', 50),
+            'entrega_p95': self.metricas.percentil('latencia_entrega', 95),
+            'retraso_p50': self.metricas.percentil('retraso_programacion', 50),
+            'retraso_p95': self.metricas.percentil('retraso_programacion', 95),
+        }
+
+    def resumen_proximo(self):
+        """Nombre y hora del próximo aviso programado, o None"""
+        siguiente = self.planificador.proximo()
+        if siguiente is None:
+            return None
+        plazo, nombre = siguiente
+        pared = self.reloj.pared() + plazo - self.reloj.monotonico()
+        return {'nombre': nombre, 'hora': datetime.fromtimestamp(round(pared)).strftime("%H:%M:%S")}
+
+    def exportar_metricas(self):
+        """Escribe metricas.json y metricas.prom si hubo cambios desde la última vez"""
+        if self.metricas.cambios == self._cambios_exportados:
+            return
+        self._cambios_exportados = self.metricas.cambios
+        try:
+            escribir_json_atomico(METRICS_FILE, self.metricas.exportar())
+            temporal = METRICS_PROM_FILE.with_name(METRICS_PROM_FILE.name + '.tmp')
+            temporal.write_text(self.metricas.texto_prometheus(), encoding='utf-8')
+            os.replace(temporal, METRICS_PROM_FILE)
+        except OSError as e:
+            self.registrar_log(f"No se pudieron exportar las métricas: {str(e)}")
+    
+    def emitir_aviso(self, recordatorio=None, programado=None):
+        """Cuenta un aviso (de un recordatorio, o a pedido) y lo deja pendiente de entrega.
+
+        programado es el instante de pared en que le tocaba, para el
+        historial. La notificación la manda entregar_avisos(), que puede
+        juntarlo con otros. Devuelve el aviso pendiente.
+        """
+        self.contador_avisos += 1
+        self.ultimo_aviso = datetime.fromtimestamp(self.reloj.pared()).strftime("%H:%M:%S")
+        if recordatorio is not None and recordatorio.nombre != PRINCIPAL:
+            self.registrar_log(f"Aviso #{self.contador_avisos} emitido ({recordatorio.nombre})")
+        else:
+            self.registrar_log(f"Aviso #{self.contador_avisos} emitido")
+        print(f"[AVISO] #{self.contador_avisos} - {self.ultimo_aviso}")
+        aviso = {'numero': self.contador_avisos, 'recordatorio': recordatorio,
+                 'programado': programado, 'atrasados': 0}
+        self.limitador.agregar(aviso)
+        return aviso
+
+    def entregar_avisos(self, forzar=False):
+        """Entrega los avisos pendientes en una notificación, si el límite lo permite.
+
+        Con forzar se entregan aunque no haya ficha (al detener el servicio).
+        Devuelve cuántos avisos entregó (0 si no había o deben esperar).
+        """
+        lote = self.limitador.tomar(self.reloj.monotonico(), forzar)
+        if not lote:
+            return 0
+        emitido = self.reloj.pared()
+        hora = datetime.fromtimestamp(emitido).strftime("%H:%M:%S")
+        if len(lote) == 1:
+            aviso = lote[0]
+            recordatorio = aviso['recordatorio']
+            titulo = f"🔔 Aviso #{aviso['numero']}"
+            cuerpo = f"Hora: {hora}"
+            if recordatorio is not None and recordatorio.nombre != PRINCIPAL:
+                cuerpo = f"{recordatorio.nombre} - {cuerpo}"
+            if recordatorio is not None and recordatorio.mensaje:
+                titulo = f"🔔 {recordatorio.mensaje}"
+            if aviso['atrasados']:
+                cuerpo += f" ({aviso['atrasados']} atrasados)"
+            descripcion = f"Aviso #{aviso['numero']}"
+        else:
+            titulo = f"🔔 {len(lote)} avisos pendientes"
+            cuerpo = f"{self.describir_lote(lote)} - Hora: {hora}"
+            descripcion = f"{len(lote)} avisos (#{lote[0]['numero']}-#{lote[-1]['numero']})"
+
+        resultado = self.notificador.enviar(titulo, cuerpo)
+        self.metricas.incrementar('avisos_emitidos', len(lote))
+        self.metricas.incrementar('notificaciones')
+        if len(lote) > 1:
+            self.metricas.incrementar('avisos_agrupados', len(lote) - 1)
+        self.metricas.observar('latencia_entrega', resultado['latencia'])
+        if not resultado['ok']:
+            self.metricas.incrementar('entregas_fallidas')
+        if resultado['ok']:
+            self.registrar_log(f"Notificación enviada para {descripcion} "
+                               f"({resultado['latencia'] * 1000:.0f} ms)")
+        else:
+            self.registrar_log(f"Error al enviar notificación: {resultado['error']}")
+
+        inicio = time.perf_counter()
+        try:
+            for aviso in lote:
+                recordatorio = aviso['recordatorio']
+                self.historial.registrar(aviso['numero'], recordatorio.nombre if recordatorio else MANUAL,
+                                         emitido, resultado['ok'], resultado['latencia'],
+                                         programado=aviso['programado'], error=resultado['error'])
+            self.metricas.observar('escritura_historial', time.perf_counter() - inicio)
+        except sqlite3.Error as e:
+            self.registrar_log(f"No se pudo guardar el aviso en el historial: {str(e)}")
+        return len(lote)
+
+    def describir_lote(self, lote):
+        """'agua, pausa x2 (5 atrasados)': cada recordatorio del lote una vez, en orden"""
+        cantidades, atrasados = {}, {}
+        for aviso in lote:
+            recordatorio = aviso['recordatorio']
+            if recordatorio is None:
+                nombre = 'a pedido'
+            else:
+                nombre = recordatorio.mensaje or recordatorio.nombre
+            cantidades[nombre] = cantidades.get(nombre, 0) + 1
+            atrasados[nombre] = atrasados.get(nombre, 0) + aviso['atrasados']
+        partes = []
+        for nombre, cantidad in cantidades.items():
+            parte = nombre if cantidad == 1 else f"{nombre} x{cantidad}"
+            if atrasados[nombre]:
+                parte += f" ({atrasados[nombre]} atrasados)"
+            partes.append(parte)
+        return ', '.join(partes)
+
+    def atender_vencido(self, nombre, plazo, ahora_mono, ahora_pared):
+        """Emite el aviso de un recordatorio vencido y lo reprograma.
+
+        Aplica la política de recuperación a los avisos atrasados; devuelve
+        1 si quedó un aviso pendiente de entrega, 0 si se omitió.
+        """
+        recordatorio = self.planificador.recordatorios[nombre]
+        # Cuánto después del plazo se despertó el loop (negativo si se adelantó para agruparlo)
+        retraso = ahora_mono - plazo
+        if self.recuperacion == 'ninguno' and retraso > ATRASO_MAXIMO:
+            atrasados = self.planificador.disparar(nombre, self.reloj.monotonico(), self.reloj.pared())
+            self.omitir(nombre, 1 + atrasados)
+            return 0
+        if retraso < 0:
+            # Adelantado para salir junto con otro vencido: se cuenta aparte
+            # en lugar de sumarlo al retraso como 0
+            self.metricas.incrementar('avisos_adelantados')
+        else:
+            self.metricas.observar('retraso_programacion', retraso)
+        aviso = self.emitir_aviso(recordatorio, programado=ahora_pared + plazo - ahora_mono)
+        atrasados = self.planificador.disparar(nombre, self.reloj.monotonico(), self.reloj.pared())
+        if atrasados > 0:
+            # Se perdieron plazos (suspensión, notificación lenta): se
+            # saltean manteniendo la fase de la cadencia
+            self.omitir(nombre, atrasados)
+            if self.recuperacion == 'resumen':
+                aviso['atrasados'] = atrasados
+        return 1
+
+    def omitir(self, nombre, cantidad):
+        """Registra avisos atrasados que no se van a notificar"""
+        self.registrar_log(f"Se omitieron {cantidad} avisos atrasados ({nombre})")
+        self.metricas.incrementar('avisos_omitidos', cantidad)
+        try:
+            self.historial.registrar_omitidos(nombre, cantidad, self.reloj.pared())
+        except sqlite3.Error as e:
+            self.registrar_log(f"No se pudo guardar en el historial: {str(e)}")
+
+    def configurar_entrega(self):
+        """Aplica la clave 'entrega' de config.json si cambió"""
+        fuente = leer_config().get('entrega')
+        if fuente == self._fuente_entrega:
+            return
+        self._fuente_entrega = fuente
+        try:
+            rafaga, por_minuto, ventana, self.recuperacion = config_entrega({'entrega': fuente})
+        except ValueError as e:
+            self.registrar_log(f"Configuración de entrega inválida, se usan los valores por defecto: {str(e)}")
+            rafaga, por_minuto, ventana, self.recuperacion = (
+                ENTREGA_RAFAGA, ENTREGA_POR_MINUTO, ENTREGA_VENTANA, ENTREGA_RECUPERACION)
+        self.limitador.configurar(rafaga, por_minuto, ventana)
+        if fuente is not None:
+            self.registrar_log(f"Entrega: ráfaga {rafaga}, {por_minuto:g} por minuto, ventana {ventana:g}s, "
+                               f"recuperación '{self.recuperacion}'")
+
+    def publicar(self, evento):
+        """Envía el estado actual a los clientes IPC suscriptos"""
+        if self.ipc is not None:
+            self.ipc.publicar({
+                'evento': evento,
+                'corriendo': self.corriendo,
+                'ultimo_aviso': self.ultimo_aviso,
+                'contador_avisos': self.contador_avisos,
+                'metricas': self.resumen_metricas(),
+                'recordatorios': len(self.planificador),
+                'proximo': self.resumen_proximo(),
+            })
+
+    def detener(self, motivo):
+        """Pide al loop que termine; se atiende en el momento aunque esté esperando"""
+        self.registrar_log(motivo)
+        self.corriendo = False
+        self.despertar.set()
+
+    def terminar(self, motivo):
+        """Termina el loop sin marcar 'corriendo': false, así el próximo arranque no se detiene solo"""
+        self.registrar_log(motivo)
+        self.terminando = True
+        self.despertar.set()
+
+    def atender_comando(self, mensaje):
+        """Ejecuta un comando recibido por IPC (se llama desde el hilo del cliente)"""
+        cmd = mensaje.get('cmd')
+        if cmd == 'estado':
+            pass
+        elif cmd == 'detener':
+            self.detener("Detención solicitada por IPC")
+        elif cmd == 'intervalo':
+            intervalo = int(mensaje['valor'])
+            if not guardar_config_file(intervalo):
+                return {'ok': False, 'error': 'No se pudo guardar la configuración'}
+            self.registrar_log(f"Intervalo actualizado por IPC: {intervalo}s")
+            self.despertar.set()
+        elif cmd == 'recordatorios':
+            if 'lista' not in mensaje:
+                return {'recordatorios': self.pedir_recordatorios()}
+            if not guardar_recordatorios(mensaje['lista']):
+                return {'ok': False, 'error': 'No se pudo guardar la configuración'}
+            self.registrar_log(f"Recordatorios actualizados por IPC: {len(mensaje['lista'])}")
+            self.despertar.set()
+        elif cmd == 'emitir':
+            self.emitir_ahora = True
+            self.despertar.set()
+        elif cmd == 'historial':
+            # Conexión propia: este método corre en el hilo del cliente IPC
+            historial = HistorialAvisos(HISTORY_FILE)
+            try:
+                return {
+                    'dias': historial.resumen_dias(int(mensaje.get('dias', 7)), self.reloj.pared()),
+                    'horas': historial.resumen_horas(int(mensaje.get('horas', 24)), self.reloj.pared()),
+                }
+            finally:
+                historial.cerrar()
+        elif cmd == 'metricas':
+            if mensaje.get('formato') == 'prometheus':
+                return {'texto': self.metricas.texto_prometheus()}
+            return self.metricas.exportar()
+        else:
+            return {'ok': False, 'error': f'Comando desconocido: {cmd}'}
+        # Lo último que guardó el loop (el planificador no se toca desde este hilo)
+        return dict(self.estado.copia(),
+                    corriendo=self.corriendo,
+                    ultimo_aviso=self.ultimo_aviso,
+                    contador_avisos=self.contador_avisos)
+
+    def pedir_recordatorios(self):
+        """Lista de recordatorios para un cliente IPC (se llama desde su hilo).
+
+        El planificador no se toca desde este hilo: se deja el pedido, se
+        despierta el loop y se espera a que lo atienda con atender_pedidos().
+        """
+        listo, respuesta = threading.Event(), {}
+        self._pedidos_lista.append((listo, respuesta))
+        self.despertar.set()
+        if not listo.wait(IPC_RESPUESTA_TIMEOUT):
+            raise TimeoutError("El servicio no atendió el pedido a tiempo")
+        return respuesta['lista']
+
+    def atender_pedidos(self):
+        """Responde en el loop los pedidos de la lista de recordatorios pendientes"""
+        if not self._pedidos_lista:
+            return
+        lista = self.listar_recordatorios()
+        while self._pedidos_lista:
+            listo, respuesta = self._pedidos_lista.popleft()
+            respuesta['lista'] = lista
+            listo.set()
+
+    def listar_recordatorios(self):
+        """Recordatorios configurados, cada uno con la hora de su próximo aviso"""
+        siguientes = self.planificador.siguientes(self.reloj.monotonico(), self.reloj.pared())
+        lista = []
+        for recordatorio in self.planificador.recordatorios.values():
+            datos = recordatorio.a_dict()
+            pared = siguientes.get(recordatorio.nombre)
+            datos['proximo'] = None if pared is None else datetime.fromtimestamp(round(pared)).isoformat(timespec='seconds')
+            lista.append(datos)
+        return lista
+
+    def leer_recordatorios(self):
+        """Recordatorios válidos de config.json, o None si no cambiaron desde la última lectura"""
+        config = leer_config()
+        fuente = config.get('recordatorios')
+        if not isinstance(fuente, list):
+            # Configuración anterior: sólo el intervalo global
+            fuente = ('intervalo', config.get('intervalo'))
+            if fuente == self._fuente_config:
+                return None
+        elif fuente is self._fuente_config:
+            # LectorJSON devuelve la misma lista mientras el archivo no cambie
+            return None
+        self._fuente_config = fuente
+
+        recordatorios, nombres = [], set()
+        for datos in recordatorios_de_config(config, INTERVALO_DEFECTO):
+            try:
+                recordatorio = Recordatorio.desde_dict(datos)
+            except ValueError as e:
+                self.registrar_log(f"Recordatorio ignorado: {str(e)}")
+                continue
+            if recordatorio.nombre in nombres:
+                self.registrar_log(f"Recordatorio ignorado: nombre repetido '{recordatorio.nombre}'")
+                continue
+            nombres.add(recordatorio.nombre)
+            recordatorios.append(recordatorio)
+        return recordatorios
+
+    def aplicar_recordatorios(self, ahora_mono, ahora_pared):
+        """Reprograma sólo los recordatorios que cambiaron en config.json; True si cambió alguno"""
+        recordatorios = self.leer_recordatorios()
+        if recordatorios is None:
+            return False
+        agregados, quitados, modificados = self.planificador.aplicar(recordatorios, ahora_mono, ahora_pared)
+        cambios = agregados + quitados + modificados
+        if not cambios:
+            return False
+        detalle = f": {', '.join(cambios)}" if len(cambios) <= 5 else ""
+        self.registrar_log(f"Recordatorios aplicados ({len(agregados)} nuevos, {len(quitados)} quitados, "
+                           f"{len(modificados)} modificados; {len(self.planificador)} programados){detalle}")
+        return True
+
+    def archivo_modificado(self, ruta):
+        """Llamado por el vigilante: despierta el loop si cambió la configuración o hay señal de detención"""
+        if ruta == CONFIG_FILE or self.estado.detencion_solicitada():
+            self.despertar.set()
+
+    def ejecutar_servicio(self):
+        """Loop principal del servicio.
+
+        Un solo hilo atiende todos los recordatorios: espera hasta el plazo
+        más cercano del planificador (reloj monotónico; cada intervalo avanza
+        desde su plazo anterior, así el tiempo de trabajo no se acumula como
+        deriva). La espera es interrumpible: un comando IPC, un cambio en
+        config.json o la señal de detención en status.json despiertan el
+        loop y los plazos afectados se recalculan en el momento.
+        """
+        self.registrar_log("=== SERVICIO INICIADO ===")
+
+        self.ipc = ServidorIPC(self.atender_comando)
+        try:
+            self.ipc.iniciar()
+        except OSError as e:
+            self.ipc = None
+            self.registrar_log(f"IPC no disponible, se usan sólo archivos: {str(e)}")
+
+        vigilante = VigilanteArchivos([CONFIG_FILE, STATUS_FILE], self.archivo_modificado)
+        vigilante.iniciar()
+
+        try:
+            borrados = self.historial.purgar(ahora=self.reloj.pared())
+            if borrados:
+                self.registrar_log(f"Historial: se borraron {borrados} avisos antiguos")
+        except sqlite3.Error as e:
+            self.registrar_log(f"Historial no disponible: {str(e)}")
+
+        marca_mono, marca_pared = self.reloj.monotonico(), self.reloj.pared()
+        ultima_exportacion = marca_mono
+        self.aplicar_recordatorios(marca_mono, marca_pared)
+        self.configurar_entrega()
+        self.guardar_estado()
+        if self.latido is not None:
+            self.latido.escribir(inicio=datetime.now().isoformat(timespec='seconds'),
+                                 supervisor=os.getenv('DESPERTADOR_SUPERVISOR'))
+        proximo_latido = marca_mono + LATIDO_INTERVALO
+
+        while self.corriendo and not self.terminando:
+            try:
+                ahora_mono = self.reloj.monotonico()
+                siguiente = self.planificador.proximo()
+                restante = (siguiente[0] if siguiente else math.inf) - ahora_mono
+                if self.latido is not None:
+                    restante = min(restante, proximo_latido - ahora_mono)
+                # Avisos retenidos por el límite: despertar cuando haya ficha
+                restante = min(restante, self.limitador.proxima_entrega(ahora_mono) - ahora_mono)
+                if restante > 0 and not self.emitir_ahora:
+                    self.reloj.esperar(self.despertar, min(restante, ESPERA_MAXIMA))
+                self.despertar.clear()
+
+                # El latido lo renueva el loop: si se cuelga, el latido vence
+                if self.latido is not None and self.reloj.monotonico() >= proximo_latido:
+                    self.latido.latir()
+                    proximo_latido = self.reloj.monotonico() + LATIDO_INTERVALO
+
+                # Verificar si se solicitó detención desde GUI
+                if self.corriendo and self.estado.detencion_solicitada():
+                    self.registrar_log("Detención solicitada desde GUI")
+                    self.corriendo = False
+                if not self.corriendo or self.terminando:
+                    break
+
+                # Suspensión/reanudación: el reloj de pared avanzó más que el
+                # monotónico (que en algunos sistemas se detiene al suspender)
+                ahora_mono, ahora_pared = self.reloj.monotonico(), self.reloj.pared()
+                salto = (ahora_pared - marca_pared) - (ahora_mono - marca_mono)
+                marca_mono, marca_pared = ahora_mono, ahora_pared
+                reprogramado = abs(salto) > UMBRAL_SALTO_RELOJ
+                if reprogramado:
+                    self.registrar_log(f"Salto de reloj detectado: {salto:+.0f}s")
+                    self.metricas.incrementar('saltos_reloj')
+                    self.planificador.desplazar(salto, ahora_mono, ahora_pared)
+
+                # Configuración nueva: reprogramar sólo lo que cambió
+                inicio = time.perf_counter()
+                if self.aplicar_recordatorios(ahora_mono, ahora_pared):
+                    reprogramado = True
+                self.configurar_entrega()
+                self.metricas.observar('lectura_config', time.perf_counter() - inicio)
+                if reprogramado:
+                    # El próximo aviso cambió aunque no salga ninguno ahora:
+                    # status.json y la GUI no deben esperar al próximo aviso
+                    self.guardar_estado()
+                    self.publicar('config')
+                self.atender_pedidos()
+
+                if self.emitir_ahora:
+                    # Aviso a pedido: no altera la cadencia programada
+                    self.emitir_ahora = False
+                    self.emitir_aviso()
+                    self.entregar_avisos()
+                    self.guardar_estado()
+                    self.publicar('aviso')
+                    continue
+
+                # Todos los recordatorios vencidos al despertar y, si alguno
+                # venció, los que vencen dentro de la ventana de agrupación: salen
+                # en una notificación. Sin uno vencido la ventana no se abre, así
+                # un despertar por latido, IPC o archivo no adelanta avisos
+                disparados = 0
+                siguiente = self.planificador.proximo()
+                if siguiente is not None and siguiente[0] <= ahora_mono:
+                    limite = ahora_mono + self.limitador.ventana
+                    while siguiente is not None and siguiente[0] <= limite:
+                        plazo, nombre = siguiente
+                        disparados += 1
+                        self.atender_vencido(nombre, plazo, ahora_mono, ahora_pared)
+                        siguiente = self.planificador.proximo()
+                # También los que esperaban que el límite les diera una ficha
+                entregados = self.entregar_avisos()
+                if not disparados and not entregados:
+                    continue
+                self.metricas.incrementar('ciclos')
+
+                # Sólo en ciclos con avisos: las esperas sin avisos (cada
+                # ESPERA_MAXIMA) no reescriben metricas.json y metricas.prom
+                if ahora_mono - ultima_exportacion >= METRICAS_INTERVALO:
+                    ultima_exportacion = ahora_mono
+                    self.exportar_metricas()
+
+                # Una sola escritura de status.json y un solo evento por ciclo
+                self.guardar_estado()
+                self.publicar('aviso')
+
+            except Exception as e:
+                self.registrar_log(f"ERROR en loop: {str(e)}")
+                self.metricas.incrementar('errores_loop')
+                inicio = self.reloj.monotonico()
+                self.reloj.esperar(self.despertar, 5)
+                self.metricas.observar('espera_por_error', self.reloj.monotonico() - inicio)
+
+        vigilante.detener()
+        if self.latido is not None:
+            self.latido.detener()
+        # Los avisos retenidos por el límite no se pierden al detener
+        self.entregar_avisos(forzar=True)
+        self.registrar_log("=== SERVICIO DETENIDO ===")
+        self.guardar_estado()
+        self.exportar_metricas()
+        self.publicar('detenido')
+        self.atender_pedidos()
+        self.historial.cerrar()
+        if self.ipc is not None:
+            self.ipc.cerrar()
+        escritor_log.cerrar()
+
+
+class LectorLog:
+    """Lee las últimas líneas de un log sin recorrer el archivo completo.
+
+    La primera lectura busca hacia atrás desde el final hasta juntar las
+    líneas pedidas; las siguientes sólo leen los bytes agregados desde la
+    lectura anterior. Si el archivo fue truncado ("Limpiar Logs") o rotado
+    (cambia el inodo), vuelve a empezar desde el final.
+    """
+
+    TAM_BLOQUE = 8192
+    TAM_FIRMA = 64
+
+    def __init__(self, ruta, max_lineas=30):
+        self.ruta = Path(ruta)
+        self.max_lineas = max_lineas
+        self.reiniciar()
+
+    def reiniciar(self):
+        """Olvida la posición y las líneas leídas"""
+        self.lineas = deque(maxlen=self.max_lineas)
+        self.offset = 0
+        self.firma = b''
+        self.identidad = None
+
+    def leer(self):
+        """Devuelve las últimas líneas como texto, o None si no existe el archivo"""
+        if self.leer_nuevas() is None:
+            return None
+        return ''.join(self.lineas)
+
+    def leer_nuevas(self):
+        """Devuelve (reiniciado, líneas nuevas desde la llamada anterior), o None si no existe.
+
+        reiniciado es True en la primera lectura y cuando el archivo fue
+        truncado: quien muestre las líneas debe descartar lo que tenía. Tras
+        una rotación las líneas del archivo nuevo se informan como agregadas.
+        """
+        try:
+            st = os.stat(self.ruta)
+        except FileNotFoundError:
+            self.reiniciar()
+            return None
+
+        identidad = (st.st_dev, st.st_ino)
+        with open(self.ruta, 'rb') as f:
+            if identidad != self.identidad or not self._sigue_igual(f, st.st_size):
+                # Archivo nuevo, rotado o truncado
+                rotado = self.identidad is not None and identidad != self.identidad
+                self.reiniciar()
+                self.identidad = identidad
+                return not rotado, self._cargar_cola(f, st.st_size)
+            if st.st_size > self.offset:
+                f.seek(self.offset)
+                return False, self._agregar(f.read(st.st_size - self.offset))
+        return False, []
+
+    def _sigue_igual(self, f, tamanio):
+        """Comprueba que lo ya leído no haya cambiado (detecta truncado)"""
+        if tamanio < self.offset:
+            return False
+        if not self.firma:
+            return True
+        f.seek(self.offset - len(self.firma))
+        return f.read(len(self.firma)) == self.firma
+
+    def _cargar_cola(self, f, tamanio):
+        """Retrocede por bloques desde el final hasta reunir max_lineas"""
+        inicio = tamanio
+        datos = b''
+        while inicio > 0 and datos.count(b'\n') <= self.max_lineas:
+            paso = min(self.TAM_BLOQUE, inicio)
+            inicio -= paso
+            f.seek(inicio)
+            datos = f.read(paso) + datos
+        if inicio > 0:
+            # Descartar la primera línea, que quedó cortada
+            corte = datos.find(b'\n') + 1
+            inicio += corte
+            datos = datos[corte:]
+        self.offset = inicio
+        return self._agregar(datos)[-self.max_lineas:]
+
+    def _agregar(self, datos):
+        """Incorpora líneas completas; una línea sin salto final se lee la próxima vez"""
+        fin = datos.rfind(b'\n') + 1
+        if fin == 0:
+            return []
+        nuevas = [linea.decode('utf-8', errors='replace')
+                  for linea in datos[:fin].splitlines(keepends=True)]
+        self.lineas.extend(nuevas)
+        self.offset += fin
+        self.firma = (self.firma + datos[max(0, fin - self.TAM_FIRMA):fin])[-self.TAM_FIRMA:]
+        return nuevas
+
+
+class AlmacenLogs:
+    """Log activo más segmentos comprimidos con un índice de timestamps.
+
+    Cuando app.log supera LOG_MAX_BYTES o su primera línea tiene más de
+    LOG_MAX_EDAD segundos, se archiva en logs/app-AAAAMMDD-HHMMSS-NNN.log.gz
+    junto a un .idx.json con el primer y último timestamp, la cantidad de
+    líneas y marcas (timestamp, offset) cada MARCA_CADA líneas. Las
+    consultas por rango sólo abren los segmentos que se solapan.
+    """
+
+    MARCA_CADA = 1000
+    FORMATO_TS = "%Y-%m-%d %H:%M:%S"
+
+    def __init__(self, ruta, directorio, max_bytes=LOG_MAX_BYTES,
+                 max_edad=LOG_MAX_EDAD, max_segmentos=LOG_MAX_SEGMENTOS):
+        self.ruta = Path(ruta)
+        self.directorio = Path(directorio)
+        self.max_bytes = max_bytes
+        self.max_edad = max_edad
+        self.max_segmentos = max_segmentos
+        self._lock = threading.Lock()
+        self._primer_ts = None  # (identidad del archivo, timestamp de su primera línea)
+        self._tamanio_visto = 0  # tamaño tras la última escritura: si baja, el log se truncó
+        self._indices = {}
+        # Hora actual para la edad del log y el nombre de los segmentos (reemplazable en simulaciones)
+        self.ahora = datetime.now
+
+    # --- Escritura y rotación ---
+
+    def escribir(self, texto):
+        """Agrega texto al log activo, rotando antes si corresponde"""
+        with self._lock:
+            if self._debe_rotar():
+                try:
+                    self.rotar()
+                except OSError:
+                    # Otro proceso tiene el archivo abierto: se reintenta en la próxima escritura
+                    pass
+            with open(self.ruta, 'a', encoding='utf-8') as f:
+                f.write(texto)
+                self._tamanio_visto = f.tell()
+
+    def _debe_rotar(self):
+        try:
+            st = os.stat(self.ruta)
+        except FileNotFoundError:
+            return False
+        # "Limpiar Logs" trunca sin cambiar el inodo: se nota porque el
+        # archivo quedó más chico que después de la última escritura
+        if st.st_size < self._tamanio_visto:
+            self._primer_ts = None
+        self._tamanio_visto = st.st_size
+        if st.st_size == 0:
+            return False
+        if st.st_size >= self.max_bytes:
+            return True
+
+        identidad = (st.st_dev, st.st_ino)
+        if self._primer_ts is None or self._primer_ts[0] != identidad:
+            with open(self.ruta, 'rb') as f:
+                self._primer_ts = (identidad, self._extraer_ts(f.readline()))
+        primer_ts = self._primer_ts[1]
+        if primer_ts is None:
+            return False
+        try:
+            inicio = datetime.strptime(primer_ts, self.FORMATO_TS)
+        except ValueError:
+            return False
+        return (self.ahora() - inicio).total_seconds() >= self.max_edad
+
+    def rotar(self):
+        """Archiva el log activo como segmento comprimido con su índice"""
+        self.directorio.mkdir(parents=True, exist_ok=True)
+        # La GUI y el servicio pueden rotar a la vez: cada proceso usa su
+        # temporal y toma el nombre del segmento en forma exclusiva
+        temporal = self.directorio / f"rotando.{os.getpid()}.log"
+        os.replace(self.ruta, temporal)
+        self._primer_ts = None
+        self._tamanio_visto = 0
+
+        indice = {'primer_ts': None, 'ultimo_ts': None, 'lineas': 0, 'bytes': 0, 'marcas': []}
+        sello = self.ahora().strftime('%Y%m%d-%H%M%S')
+        n = 0
+        while True:
+            nombre = f"app-{sello}-{n:03d}"
+            try:
+                archivo = open(self.directorio / f"{nombre}.log.gz", 'xb')
+                break
+            except FileExistsError:
+                n += 1
+
+        with archivo, open(temporal, 'rb') as origen, gzip.GzipFile(fileobj=archivo, mode='wb') as comprimido:
+            offset = 0
+            for linea in origen:
+                ts = self._extraer_ts(linea)
+                if ts is not None:
+                    if indice['primer_ts'] is None:
+                        indice['primer_ts'] = ts
+                    indice['ultimo_ts'] = ts
+                    if indice['lineas'] % self.MARCA_CADA == 0 or not indice['marcas']:
+                        indice['marcas'].append([ts, offset])
+                comprimido.write(linea)
+                offset += len(linea)
+                indice['lineas'] += 1
+            indice['bytes'] = offset
+
+        with open(self.directorio / f"{nombre}.idx.json", 'w') as f:
+            json.dump(indice, f)
+        os.remove(temporal)
+        self._purgar()
+
+    def _purgar(self):
+        """Elimina los segmentos más viejos por encima de max_segmentos"""
+        segmentos = self.segmentos()
+        for segmento in segmentos[:max(0, len(segmentos) - self.max_segmentos)]:
+            for ruta in (segmento, self._ruta_indice(segmento)):
+                try:
+                    os.remove(ruta)
+                except FileNotFoundError:
+                    pass
+            self._indices.pop(segmento.name, None)
+
+    # --- Consultas ---
+
+    def segmentos(self):
+        """Segmentos archivados, del más viejo al más nuevo"""
+        if not self.directorio.exists():
+            return []
+        return sorted(self.directorio.glob('app-*.log.gz'))
+
+    def _ruta_indice(self, segmento):
+        return segmento.with_name(segmento.name[:-len('.log.gz')] + '.idx.json')
+
+    def _leer_indice(self, segmento):
+        indice = self._indices.get(segmento.name)
+        if indice is None:
+            try:
+                with open(self._ruta_indice(segmento), 'r') as f:
+                    indice = json.load(f)
+            except (OSError, ValueError):
+                return None
+            self._indices[segmento.name] = indice
+        return indice
+
+    def consultar(self, desde=None, hasta=None):
+        """Genera las líneas con timestamp entre desde y hasta (datetime, inclusive)"""
+        desde = desde.strftime(self.FORMATO_TS) if desde else None
+        hasta = hasta.strftime(self.FORMATO_TS) if hasta else None
+
+        for segmento in self.segmentos():
+            indice = self._leer_indice(segmento)
+            offset = 0
+            if indice is not None and indice['primer_ts'] is not None:
+                if desde and indice['ultimo_ts'] < desde:
+                    continue
+                if hasta and indice['primer_ts'] > hasta:
+                    continue
+                if desde:
+                    for ts, marca in indice['marcas']:
+                        if ts > desde:
+                            break
+                        offset = marca
+            try:
+                with gzip.open(segmento, 'rb') as f:
+                    f.seek(offset)
+                    yield from self._filtrar(f, desde, hasta)
+            except (OSError, EOFError):
+                continue
+
+        try:
+            with open(self.ruta, 'rb') as f:
+                yield from self._filtrar(f, desde, hasta)
+        except FileNotFoundError:
+            pass
+
+    def _filtrar(self, f, desde, hasta):
+        ts_actual = None
+        for linea in f:
+            ts = self._extraer_ts(linea)
+            if ts is not None:
+                ts_actual = ts
+            # Líneas sin timestamp heredan el de la línea anterior
+            if ts_actual is None or (desde and ts_actual < desde):
+                continue
+            if hasta and ts_actual > hasta:
+                return
+            yield linea.decode('utf-8', errors='replace')
+
+    def _extraer_ts(self, linea):
+        """Devuelve el timestamp "AAAA-MM-DD HH:MM:SS" de una línea de log, o None"""
+        if len(linea) < 21 or linea[:1] != b'[' or linea[20:21] != b']':
+            return None
+        ts = linea[1:20].decode('ascii', errors='replace')
+        if not ts[:4].isdigit():
+            return None
+        return ts
+
+
+class EscritorLogAsync:
+    """Escribe el log desde un hilo propio, en lotes.
+
+    escribir() sólo encola la línea y vuelve en el momento. El hilo junta
+    hasta lote_max líneas o flush_intervalo segundos y las escribe con una
+    sola apertura del archivo. Si el disco se atrasa y la cola pasa del 80%,
+    entra en modo muestreo (guarda 1 de cada LOG_MUESTREO líneas) hasta que
+    baje del 20%; con la cola llena las líneas se descartan. En ambos casos
+    se deja constancia de cuántas se perdieron.
+    """
+
+    _FIN = object()
+
+    def __init__(self, almacen, max_cola=LOG_COLA_MAX, lote_max=LOG_LOTE_MAX,
+                 flush_intervalo=LOG_FLUSH_INTERVALO):
+        self.almacen = almacen
+        self.cola = queue.Queue(maxsize=max_cola)
+        self.max_cola = max_cola
+        self.lote_max = lote_max
+        self.flush_intervalo = flush_intervalo
+        self.muestreando = False
+        self.descartadas = 0
+        self._contador = 0
+        self._hilo = None
+        self._lock = threading.Lock()
+
+    def escribir(self, linea):
+        """Encola una línea sin bloquear"""
+        if self._hilo is None:
+            self._iniciar()
+
+        ocupacion = self.cola.qsize()
+        if not self.muestreando and ocupacion > self.max_cola * 0.8:
+            self.muestreando = True
+        if self.muestreando:
+            self._contador += 1
+            if self._contador % LOG_MUESTREO:
+                self.descartadas += 1
+                return
+        try:
+            self.cola.put_nowait(linea)
+        except queue.Full:
+            self.descartadas += 1
+
+    def cerrar(self, timeout=5.0):
+        """Escribe lo pendiente y detiene el hilo (se reinicia si se vuelve a escribir)"""
+        with self._lock:
+            hilo, self._hilo = self._hilo, None
+            if hilo is None:
+                return
+            try:
+                self.cola.put(self._FIN, timeout=timeout)
+            except queue.Full:
+                return
+        hilo.join(timeout)
+
+    def _iniciar(self):
+        with self._lock:
+            if self._hilo is None:
+                self._hilo = threading.Thread(target=self._trabajar, daemon=True)
+                self._hilo.start()
+
+    def _trabajar(self):
+        fin = False
+        while not fin:
+            primera = self.cola.get()
+            if primera is self._FIN:
+                break
+            lote = [primera]
+            limite = time.monotonic() + self.flush_intervalo
+            while len(lote) < self.lote_max:
+                restante = limite - time.monotonic()
+                try:
+                    linea = self.cola.get(timeout=restante) if restante > 0 else self.cola.get_nowait()
+                except queue.Empty:
+                    break
+                if linea is self._FIN:
+                    fin = True
+                    break
+                lote.append(linea)
+
+            if self.muestreando and self.cola.qsize() < self.max_cola * 0.2:
+                self.muestreando = False
+            if self.descartadas and not self.muestreando:
+                timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                lote.append(f"[{timestamp}] Log saturado: se descartaron {self.descartadas} líneas\n")
+                self.descartadas = 0
+            try:
+                self.almacen.escribir(''.join(lote))
+            except OSError:
+                self.descartadas += len(lote)
+
+
+almacen_logs = AlmacenLogs(LOG_FILE, LOGS_DIR)
+escritor_log = EscritorLogAsync(almacen_logs)
+atexit.register(escritor_log.cerrar)
+
+def registrar_log(mensaje, momento=None):
+    """Agrega una línea con timestamp al log; la escribe el hilo de escritor_log"""
+    timestamp = datetime.fromtimestamp(time.time() if momento is None else momento).strftime("%Y-%m-%d %H:%M:%S")
+    escritor_log.escribir(f"[{timestamp}] {mensaje}\n")
+
+def consultar_logs(desde=None, hasta=None):
+    """Devuelve las líneas de log entre dos datetime, incluyendo segmentos archivados"""
+    return list(almacen_logs.consultar(desde, hasta))
+
+def avisos_del_dia(fecha):
+    """Devuelve las líneas "Aviso #N emitido" de un día (date o datetime)"""
+    inicio = datetime(fecha.year, fecha.month, fecha.day)
+    fin = inicio.replace(hour=23, minute=59, second=59)
+    return [linea for linea in almacen_logs.consultar(inicio, fin)
+            if 'Aviso #' in linea and 'emitido' in linea]
+
+
+_lectores_log = {}
+
+def leer_logs(ultimas_lineas=30):
+    """Lee las últimas N líneas del archivo de log"""
+    lector = _lectores_log.get(ultimas_lineas)
+    if lector is None:
+        lector = _lectores_log[ultimas_lineas] = LectorLog(LOG_FILE, ultimas_lineas)
+
+    try:
+        logs = lector.leer()
+    except:
+        lector.reiniciar()
+        return "Error al leer logs"
+    if logs is None:
+        return "No hay logs aún"
+    return logs
+
+def escribir_json_atomico(ruta, datos):
+    """Escribe JSON en un temporal y lo renombra, para que nunca se lea a medias"""
+    ruta = Path(ruta)
+    temporal = ruta.with_name(f"{ruta.name}.{os.getpid()}.tmp")
+    with open(temporal, 'w') as f:
+        json.dump(datos, f)
+    for intento in range(5):
+        try:
+            os.replace(temporal, ruta)
+            return
+        except PermissionError:
+            # En Windows falla si otro proceso tiene el destino abierto en ese instante
+            if intento == 4:
+                os.remove(temporal)
+                raise
+            time.sleep(0.02)
+
+
+class LectorJSON:
+    """Lee un archivo JSON y lo vuelve a parsear sólo si cambió su mtime o tamaño"""
+
+    def __init__(self, ruta):
+        self.ruta = Path(ruta)
+        self.firma = None
+        self.datos = None
+
+    def leer(self):
+        """Devuelve una copia del contenido, o None si no existe o es inválido"""
+        try:
+            st = os.stat(self.ruta)
+        except OSError:
+            self.firma = self.datos = None
+            return None
+        firma = (st.st_mtime_ns, st.st_size)
+        if firma != self.firma:
+            try:
+                with open(self.ruta, 'r') as f:
+                    self.datos = json.load(f)
+            except (OSError, ValueError):
+                self.datos = None
+            self.firma = firma
+        return dict(self.datos) if isinstance(self.datos, dict) else None
+
+    def recordar(self, datos):
+        """Registra lo que acabamos de escribir para no volver a parsearlo"""
+        try:
+            st = os.stat(self.ruta)
+        except OSError:
+            return
+        self.firma = (st.st_mtime_ns, st.st_size)
+        self.datos = dict(datos)
+
+
+class GestorEstado:
+    """Estado del servicio en memoria, volcado a status.json sólo cuando cambia.
+
+    Los cambios se acumulan con actualizar() y se escriben juntos con flush(),
+    en forma atómica. Antes de escribir se respeta una señal de detención
+    dejada en disco por la GUI.
+    """
+
+    def __init__(self, ruta=STATUS_FILE):
+        self.ruta = Path(ruta)
+        self.lector = LectorJSON(ruta)
+        self.estado = {}
+        self.sucio = False
+        self._lock = threading.Lock()
+
+    def actualizar(self, **campos):
+        """Modifica campos del estado; marca sucio sólo si algo cambió"""
+        with self._lock:
+            for clave, valor in campos.items():
+                if self.estado.get(clave, object()) != valor:
+                    self.estado[clave] = valor
+                    self.sucio = True
+
+    def copia(self):
+        """Copia del estado en memoria (puede estar aún sin escribir)"""
+        with self._lock:
+            return dict(self.estado)
+
+    def detencion_solicitada(self):
+        """True si otro proceso dejó 'corriendo': false en status.json"""
+        with self._lock:
+            en_disco = self.lector.leer()
+        return bool(en_disco) and not en_disco.get('corriendo', True)
+
+    def flush(self):
+        """Escribe el estado si hay cambios pendientes; devuelve True si escribió"""
+        with self._lock:
+            if not self.sucio:
+                return False
+            datos = dict(self.estado, ultima_actualizacion=datetime.now().isoformat())
+            escribir_json_atomico(self.ruta, datos)
+            self.lector.recordar(datos)
+            self.sucio = False
+            return True
+
+
+_lector_config = LectorJSON(CONFIG_FILE)
+_lector_estado = LectorJSON(STATUS_FILE)
+
+def leer_config():
+    """Lee la configuración desde el archivo JSON"""
+    config = _lector_config.leer()
+    if config is None:
+        return {'intervalo': INTERVALO_DEFECTO}
+    return config
+
+def guardar_config_file(intervalo):
+    """Guarda la configuración en el archivo JSON.
+
+    Con lista de recordatorios, el intervalo es el del recordatorio PRINCIPAL.
+    """
+    try:
+        config = leer_config()
+        config['intervalo'] = intervalo
+        lista = config.get('recordatorios')
+        if isinstance(lista, list):
+            nueva = []
+            for datos in lista:
+                if isinstance(datos, dict) and datos.get('nombre') == PRINCIPAL:
+                    datos = {k: v for k, v in datos.items() if k != 'hora'}
+                    datos['intervalo'] = intervalo
+                nueva.append(datos)
+            if not any(isinstance(d, dict) and d.get('nombre') == PRINCIPAL for d in nueva):
+                nueva.insert(0, {'nombre': PRINCIPAL, 'intervalo': intervalo})
+            config['recordatorios'] = nueva
+        escribir_json_atomico(CONFIG_FILE, config)
+        return True
+    except:
+        return False
+
+def guardar_recordatorios(lista):
+    """Guarda la lista de recordatorios en config.json.
+
+    Lanza ValueError si alguno es inválido o hay nombres repetidos; devuelve
+    False si no se pudo escribir.
+    """
+    recordatorios = [Recordatorio.desde_dict(datos) for datos in lista]
+    vistos, repetidos = set(), set()
+    for recordatorio in recordatorios:
+        (repetidos if recordatorio.nombre in vistos else vistos).add(recordatorio.nombre)
+    if repetidos:
+        raise ValueError(f"Nombres repetidos: {', '.join(sorted(repetidos))}")
+    try:
+        config = leer_config()
+        config['recordatorios'] = [r.a_dict() for r in recordatorios]
+        for recordatorio in recordatorios:
+            if recordatorio.nombre == PRINCIPAL and recordatorio.intervalo is not None:
+                config['intervalo'] = recordatorio.intervalo
+        escribir_json_atomico(CONFIG_FILE, config)
+        return True
+    except OSError:
+        return False
+
+def leer_estado():
+    """Lee el estado actual desde el archivo JSON"""
+    return _lector_estado.leer()
+
+# --- Canal IPC entre servicio y GUI ---
+#
+# Mensajes JSON de una línea. El servicio escucha en un socket Unix
+# (IPC_SOCKET) o, donde no existe AF_UNIX (Windows), en un puerto TCP de
+# loopback. La dirección y un token se publican en IPC_FILE; los clientes
+# deben incluir el token en cada comando. Si el canal no está disponible,
+# la GUI vuelve a leer status.json/config.json como antes.
+
+def _enviar_json(conexion, mensaje):
+    conexion.sendall((json.dumps(mensaje) + '\n').encode('utf-8'))
+
+
+class ServidorIPC:
+    """Acepta comandos de clientes locales y publica eventos a los suscriptos"""
+
+    def __init__(self, manejar_comando):
+        self.manejar_comando = manejar_comando
+        self.token = secrets.token_hex(16)
+        self.socket = None
+        self.suscriptores = []
+        self._lock = threading.Lock()
+
+    def iniciar(self):
+        """Abre el socket y publica la dirección en IPC_FILE"""
+        if hasattr(socket, 'AF_UNIX') and sys.platform != 'win32':
+            try:
+                os.remove(IPC_SOCKET)
+            except FileNotFoundError:
+                pass
+            self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.socket.bind(str(IPC_SOCKET))
+            direccion = {'familia': 'unix', 'direccion': str(IPC_SOCKET)}
+        else:
+            self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.socket.bind(('127.0.0.1', 0))
+            direccion = {'familia': 'tcp', 'direccion': list(self.socket.getsockname())}
+        self.socket.listen()
+
+        direccion['token'] = self.token
+        direccion['pid'] = os.getpid()
+        escribir_json_atomico(IPC_FILE, direccion)
+
+        threading.Thread(target=self._aceptar, daemon=True).start()
+
+    def cerrar(self):
+        """Cierra el socket y las conexiones de los suscriptos"""
+        try:
+            os.remove(IPC_FILE)
+        except OSError:
+            pass
+        if self.socket is not None:
+            self.socket.close()
+            self.socket = None
+        with self._lock:
+            for conexion in self.suscriptores:
+                try:
+                    conexion.close()
+                except OSError:
+                    pass
+            self.suscriptores = []
+        if sys.platform != 'win32':
+            try:
+                os.remove(IPC_SOCKET)
+            except OSError:
+                pass
+
+    def publicar(self, evento):
+        """Envía un evento a todos los suscriptos, descartando los desconectados.
+
+        Corre en el hilo del loop: un suscripto que deja de leer (GUI
+        suspendida) no lo bloquea más de IPC_ENVIO_TIMEOUT y se descarta.
+        """
+        with self._lock:
+            vivos = []
+            for conexion in self.suscriptores:
+                try:
+                    _enviar_json(conexion, evento)
+                    vivos.append(conexion)
+                except OSError:
+                    # También socket.timeout: el suscripto no está leyendo
+                    conexion.close()
+            self.suscriptores = vivos
+
+    def _aceptar(self):
+        while self.socket is not None:
+            try:
+                conexion, _ = self.socket.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._atender, args=(conexion,), daemon=True).start()
+
+    def _atender(self, conexion):
+        try:
+            with conexion.makefile('r', encoding='utf-8') as lector:
+                for linea in lector:
+                    try:
+                        mensaje = json.loads(linea)
+                    except ValueError:
+                        _enviar_json(conexion, {'ok': False, 'error': 'mensaje inválido'})
+                        continue
+                    if mensaje.get('token') != self.token:
+                        _enviar_json(conexion, {'ok': False, 'error': 'token inválido'})
+                        break
+                    if mensaje.get('cmd') == 'suscribir':
+                        # publicar() no debe quedar esperando a un suscripto que no lee
+                        conexion.settimeout(IPC_ENVIO_TIMEOUT)
+                        with self._lock:
+                            self.suscriptores.append(conexion)
+                        # La conexión queda abierta; sólo se le envían eventos
+                        return
+                    try:
+                        respuesta = self.manejar_comando(mensaje) or {}
+                        respuesta.setdefault('ok', True)
+                    except Exception as e:
+                        respuesta = {'ok': False, 'error': str(e)}
+                    _enviar_json(conexion, respuesta)
+        except OSError:
+            pass
+        conexion.close()
+
+
+def conectar_ipc(timeout=2.0):
+    """Conecta con el servicio; devuelve (conexión, token) o None si no está escuchando"""
+    try:
+        with open(IPC_FILE, 'r') as f:
+            datos = json.load(f)
+        if datos['familia'] == 'unix':
+            conexion = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            destino = datos['direccion']
+        else:
+            conexion = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            destino = tuple(datos['direccion'])
+        conexion.settimeout(timeout)
+        try:
+            conexion.connect(destino)
+        except OSError:
+            conexion.close()
+            raise
+        return conexion, datos['token']
+    except (OSError, ValueError, KeyError, AttributeError):
+        return None
+
+def enviar_comando(cmd, timeout=2.0, **parametros):
+    """Envía un comando al servicio y devuelve su respuesta, o None si no hay canal"""
+    conectado = conectar_ipc(timeout)
+    if conectado is None:
+        return None
+    conexion, token = conectado
+    try:
+        _enviar_json(conexion, dict(parametros, cmd=cmd, token=token))
+        with conexion.makefile('r', encoding='utf-8') as lector:
+            linea = lector.readline()
+        return json.loads(linea) if linea else None
+    except (OSError, ValueError):
+        return None
+    finally:
+        conexion.close()
+
+def suscribir_eventos(callback):
+    """Recibe eventos del servicio en un hilo; devuelve False si no hay canal.
+
+    callback se llama desde el hilo lector con cada evento, y una última vez
+    con {'evento': 'desconectado'} cuando se pierde la conexión.
+    """
+    conectado = conectar_ipc()
+    if conectado is None:
+        return False
+    conexion, token = conectado
+
+    def leer():
+        try:
+            _enviar_json(conexion, {'cmd': 'suscribir', 'token': token})
+            conexion.settimeout(None)
+            with conexion.makefile('r', encoding='utf-8') as lector:
+                for linea in lector:
+                    try:
+                        callback(json.loads(linea))
+                    except ValueError:
+                        continue
+        except OSError:
+            pass
+        finally:
+            conexion.close()
+        callback({'evento': 'desconectado'})
+
+    threading.Thread(target=leer, daemon=True).start()
+    return True
+
+
+# --- Instancia única, latido y supervisor ---
+#
+# Un solo servicio por carpeta de datos: el modo --service toma un candado
+# del sistema operativo sobre LOCK_FILE (se libera solo si el proceso
+# muere) y, mientras su loop funciona, renueva el mtime de HEARTBEAT_FILE.
+# La GUI considera que el servicio corre si ese latido es reciente. El modo
+# --supervisor corre el servicio como proceso hijo y lo reinicia si se cae
+# o deja de latir.
+
+def comando_servicio(modo='--service'):
+    """Línea de comandos para lanzar otro proceso del despertador en el modo indicado"""
+    if getattr(sys, 'frozen', False):
+        return [sys.executable, modo]
+    return [sys.executable, str(Path(__file__).resolve().with_name('despertador.py')), modo]
+
+
+class InstanciaUnica:
+    """Candado exclusivo sobre un archivo; el sistema lo libera si el proceso muere"""
+
+    def __init__(self, ruta):
+        self.ruta = Path(ruta)
+        self._archivo = None
+
+    def adquirir(self):
+        """Toma el candado sin esperar; False si otro proceso lo tiene"""
+        archivo = open(self.ruta, 'a+')
+        try:
+            if sys.platform == 'win32':
+                import msvcrt
+                archivo.seek(0)
+                msvcrt.locking(archivo.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(archivo.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            archivo.close()
+            return False
+        self._archivo = archivo
+        return True
+
+    def liberar(self):
+        if self._archivo is not None:
+            # Cerrar el archivo suelta el candado en ambos sistemas
+            self._archivo.close()
+            self._archivo = None
+
+
+class Latido:
+    """Archivo JSON con el PID de un proceso, cuyo mtime éste renueva mientras está vivo"""
+
+    def __init__(self, ruta):
+        self.ruta = Path(ruta)
+        self.datos = {}
+
+    def escribir(self, **datos):
+        """Reescribe el contenido (PID incluido); también cuenta como latido"""
+        self.datos.update(datos, pid=os.getpid())
+        escribir_json_atomico(self.ruta, self.datos)
+
+    def latir(self):
+        try:
+            os.utime(self.ruta)
+        except FileNotFoundError:
+            self.escribir()
+
+    def detener(self):
+        """Borra el archivo: el proceso terminó en forma ordenada"""
+        try:
+            os.remove(self.ruta)
+        except OSError:
+            pass
+
+def leer_latido(ruta, vencido=LATIDO_VENCIDO):
+    """Contenido de un archivo de latido más 'edad' (segundos) y 'vivo', o None si no existe"""
+    try:
+        edad = time.time() - os.stat(ruta).st_mtime
+        with open(ruta, 'r') as f:
+            datos = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(datos, dict):
+        return None
+    return dict(datos, edad=edad, vivo=edad <= vencido)
+
+def estado_servicio():
+    """Si el servicio está vivo según su latido, su PID y el estado del supervisor (o None)"""
+    latido = leer_latido(HEARTBEAT_FILE) or {}
+    supervisor = leer_latido(SUPERVISOR_FILE)
+    return {
+        'vivo': bool(latido.get('vivo')),
+        'pid': latido.get('pid'),
+        'supervisor': supervisor if supervisor and supervisor['vivo'] else None,
+    }
+
+def iniciar_servicio_unico():
+    """Modo --service: corre el servicio si no hay otra instancia; devuelve el código de salida"""
+    instancia = InstanciaUnica(LOCK_FILE)
+    if not instancia.adquirir():
+        pid = (leer_latido(HEARTBEAT_FILE) or {}).get('pid', '?')
+        mensaje = f"El servicio ya está corriendo (PID {pid}); no se inicia otra instancia"
+        escritor_log.escribir(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {mensaje}\n")
+        print(mensaje, file=sys.stderr)
+        return SALIDA_OTRA_INSTANCIA
+    try:
+        app = ServicioApp(latido=Latido(HEARTBEAT_FILE))
+        # Terminación ordenada ante SIGTERM (supervisor, kill)
+        signal.signal(signal.SIGTERM, lambda *_: app.terminar("Señal de terminación recibida"))
+        app.ejecutar_servicio()
+    finally:
+        instancia.liberar()
+    return SALIDA_TERMINADO if app.terminando else 0
+
+
+class Supervisor:
+    """Corre el servicio en un proceso hijo y lo reinicia si se cae o deja de latir.
+
+    Las esperas entre reinicios se duplican desde REINICIO_MIN hasta
+    REINICIO_MAX y vuelven al mínimo cuando el hijo corrió REINICIO_ESTABLE
+    segundos. Si el hijo termina con código 0 (detención pedida desde la
+    GUI o por IPC) el supervisor también termina. Su propio estado y latido
+    quedan en SUPERVISOR_FILE.
+    """
+
+    def __init__(self, comando=None, latido=None):
+        self.comando = comando or comando_servicio('--service')
+        self.latido = latido or Latido(SUPERVISOR_FILE)
+        self.detenerse = threading.Event()
+        self.proceso = None
+        self.reinicios = 0
+
+    def registrar_log(self, mensaje):
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        escritor_log.escribir(f"[{timestamp}] [supervisor] {mensaje}\n")
+
+    def detener(self, *_):
+        """Termina el hijo y el supervisor (se usa como manejador de señales)"""
+        self.detenerse.set()
+        if self.proceso is not None and self.proceso.poll() is None:
+            self.proceso.terminate()
+
+    def ejecutar(self):
+        self.registrar_log("=== SUPERVISOR INICIADO ===")
+        espera = REINICIO_MIN
+        entorno = dict(os.environ, DESPERTADOR_SUPERVISOR=str(os.getpid()))
+        try:
+            while not self.detenerse.is_set():
+                inicio = time.monotonic()
+                self.proceso = subprocess.Popen(self.comando, env=entorno)
+                self.latido.escribir(estado='corriendo', hijo=self.proceso.pid,
+                                     reinicios=self.reinicios, proximo_intento=None)
+                codigo = self.vigilar(inicio)
+                if self.detenerse.is_set():
+                    break
+                if codigo == 0:
+                    self.registrar_log("El servicio terminó normalmente")
+                    break
+                if time.monotonic() - inicio >= REINICIO_ESTABLE:
+                    espera = REINICIO_MIN
+                if codigo == SALIDA_OTRA_INSTANCIA:
+                    motivo = "no arrancó porque ya hay otra instancia"
+                else:
+                    motivo = f"terminó con código {codigo}"
+                self.reinicios += 1
+                self.registrar_log(f"El servicio {motivo}; reinicio #{self.reinicios} en {espera:g}s")
+                proximo = datetime.fromtimestamp(time.time() + espera).isoformat(timespec='seconds')
+                self.latido.escribir(estado='reiniciando', hijo=None,
+                                     reinicios=self.reinicios, proximo_intento=proximo)
+                self.esperar(espera)
+                espera = min(espera * 2, REINICIO_MAX)
+        finally:
+            self.latido.detener()
+            self.registrar_log("=== SUPERVISOR DETENIDO ===")
+        return 0
+
+    def vigilar(self, inicio):
+        """Espera a que termine el hijo renovando el propio latido; si el hijo
+        deja de latir lo mata. Devuelve su código de salida."""
+        while True:
+            try:
+                return self.proceso.wait(timeout=LATIDO_INTERVALO)
+            except subprocess.TimeoutExpired:
+                pass
+            self.latido.latir()
+            if self.detenerse.is_set() or time.monotonic() - inicio < REINICIO_GRACIA:
+                continue
+            # El latido del hijo se reconoce por el PID del supervisor y no por
+            # el del hijo: con el exe de PyInstaller --onefile, proceso.pid es
+            # el del cargador y el servicio corre en un proceso nieto
+            latido = leer_latido(HEARTBEAT_FILE)
+            if latido is None or latido.get('supervisor') != str(os.getpid()) or not latido['vivo']:
+                self.registrar_log("El servicio dejó de latir; se lo termina")
+                self.proceso.kill()
+                return self.proceso.wait()
+
+    def esperar(self, segundos):
+        """Espera antes de reiniciar, interrumpible y sin dejar de latir"""
+        fin = time.monotonic() + segundos
+        while not self.detenerse.is_set():
+            restante = fin - time.monotonic()
+            if restante <= 0:
+                return
+            self.detenerse.wait(min(restante, LATIDO_INTERVALO))
+            self.latido.latir()
+
+def iniciar_supervisor():
+    """Modo --supervisor: un solo supervisor por carpeta de datos; devuelve el código de salida"""
+    instancia = InstanciaUnica(SUPERVISOR_LOCK_FILE)
+    if not instancia.adquirir():
+        print("El supervisor ya está corriendo", file=sys.stderr)
+        return SALIDA_OTRA_INSTANCIA
+    supervisor = Supervisor()
+    signal.signal(signal.SIGTERM, supervisor.detener)
+    signal.signal(signal.SIGINT, supervisor.detener)
+    try:
+        return supervisor.ejecutar()
+    finally:
+        instancia.liberar()
+        escritor_log.cerrar()
@@ -0,0 +1,369 @@
+"""Simulación del servicio en tiempo acelerado.
+
+    python despertador.py --simulate escenario.json [--json]
+
+Corre el ServicioApp real (planificador, agrupación de avisos, log, estado
+e historial) sobre un reloj virtual y un notificador que sólo anota: las
+esperas adelantan el tiempo en lugar de dormir, así semanas de uso se
+simulan en segundos. Todo se escribe en una carpeta temporal, nunca en los
+datos reales. El escenario es un JSON:
+
+    {
+      "duracion": "14d",
+      "inicio": "2026-01-05T08:00",
+      "config": {"recordatorios": [{"nombre": "principal", "intervalo": 1800}]},
+      "eventos": [
+        {"en": "2d 9h", "config": {"entrega": {"por_minuto": 2}}},
+        {"en": "3d 18h", "accion": "suspender", "duracion": "14h"},
+        {"en": "6d", "accion": "detener"},
+        {"en": "6d 2h", "accion": "iniciar"},
+        {"en": "8d", "accion": "emitir"}
+      ]
+    }
+
+Los tiempos son "Nd Nh Nm Ns" o segundos, contados desde el inicio. config
+reemplaza esas claves de config.json, suspender adelanta sólo el reloj de
+pared (el monotónico se detiene, como al suspender el equipo), detener e
+iniciar equivalen a los botones de la interfaz y emitir a --emit-now.
+demora (segundos virtuales por entrega) es opcional. Al final se informan
+los avisos, el error respecto del plazo, las escrituras a disco y cuánto
+creció el log.
+"""
+import contextlib
+import io
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+
+from reloj import RelojVirtual
+
+# servicio elige la carpeta de datos al importarse: lo importa main(), después
+# de apuntar DESPERTADOR_DIR a una carpeta temporal
+servicio = None
+
+# Unidades de los tiempos del escenario
+UNIDADES = {'d': 86400, 'h': 3600, 'm': 60, 's': 1}
+DURACION_DEFECTO = '7d'
+ACCIONES = ('detener', 'iniciar', 'suspender', 'emitir')
+
+
+def segundos(valor):
+    """'3d 12h', '90m' o un número de segundos -> segundos"""
+    if isinstance(valor, (int, float)):
+        return float(valor)
+    total = 0.0
+    for parte in str(valor).split():
+        if parte[-1:] not in UNIDADES:
+            raise ValueError(f"Tiempo inválido: {valor!r} (se espera p. ej. '3d 12h')")
+        try:
+            total += float(parte[:-1]) * UNIDADES[parte[-1]]
+        except ValueError:
+            raise ValueError(f"Tiempo inválido: {valor!r} (se espera p. ej. '3d 12h')")
+    return total
+
+
+def leer_escenario(ruta):
+    """Lee y valida el escenario; devuelve (duración, inicio, config, eventos ordenados, demora)"""
+    with open(ruta, 'r', encoding='utf-8') as f:
+        escenario = json.load(f)
+    if not isinstance(escenario, dict):
+        raise ValueError("El escenario debe ser un objeto JSON")
+    duracion = segundos(escenario.get('duracion', DURACION_DEFECTO))
+    inicio = escenario.get('inicio')
+    inicio = datetime.fromisoformat(inicio).timestamp() if inicio else time.time()
+    config = escenario.get('config') or {'intervalo': servicio.INTERVALO_DEFECTO}
+    demora = float(escenario.get('demora', 0.0))
+
+    eventos = []
+    for orden, evento in enumerate(escenario.get('eventos', [])):
+        if 'en' not in evento:
+            raise ValueError(f"Evento sin 'en': {evento}")
+        if 'config' not in evento and evento.get('accion') not in ACCIONES:
+            raise ValueError(f"Evento sin 'config' ni acción válida ({', '.join(ACCIONES)}): {evento}")
+        en = segundos(evento['en'])
+        if en < duracion:
+            eventos.append((en, orden, evento))
+    eventos.sort(key=lambda e: e[:2])
+    # El fin es el último evento
+    eventos.append((duracion, len(eventos), {'accion': 'fin'}))
+    return duracion, inicio, config, eventos, demora
+
+
+class RelojEscenario(RelojVirtual):
+    """Reloj virtual que aplica los eventos del escenario cuando llega su momento.
+
+    Los eventos se cuentan en tiempo de pared desde el inicio, así una
+    suspensión no los corre. Un evento interrumpe la espera del loop, como
+    lo haría el comando IPC o el cambio de archivo que representa.
+    """
+
+    def __init__(self, inicio, eventos):
+        super().__init__(inicio)
+        self.origen = inicio
+        self.eventos = deque(eventos)
+        self.app = None
+        self.suspensiones = 0
+        self.detenciones = 0
+
+    def transcurrido_escenario(self):
+        return self.pared() - self.origen
+
+    def esperar(self, evento, timeout):
+        if evento.is_set():
+            return True
+        if self.eventos:
+            restante = self.eventos[0][0] - self.transcurrido_escenario()
+            if restante <= timeout:
+                self.avanzar(max(0.0, restante))
+                self.aplicar(self.eventos.popleft()[2])
+                return True
+        self.avanzar(timeout)
+        return evento.is_set()
+
+    def aplicar(self, evento):
+        """Aplica un evento con el servicio corriendo"""
+        if 'config' in evento:
+            self.editar_config(evento['config'])
+        accion = evento.get('accion')
+        if accion == 'detener':
+            self.detenciones += 1
+            self.app.detener("Detención solicitada (simulación)")
+        elif accion == 'suspender':
+            # El monotónico queda quieto y la pared salta, como tras suspender el equipo
+            self.suspensiones += 1
+            self.inicio += segundos(evento.get('duracion', 0))
+        elif accion == 'emitir':
+            self.app.emitir_ahora = True
+        elif accion == 'fin':
+            self.app.terminar("Fin de la simulación")
+        self.app.despertar.set()
+
+    def editar_config(self, cambios):
+        config = servicio.leer_config()
+        config.update(cambios)
+        servicio.escribir_json_atomico(servicio.CONFIG_FILE, config)
+        # mtime en hora virtual: dos ediciones en el mismo instante real no se confunden
+        os.utime(servicio.CONFIG_FILE, (self.pared(), self.pared()))
+
+    def esperar_inicio(self):
+        """Con el servicio detenido, pasa el tiempo hasta el próximo 'iniciar'; False si llega el fin"""
+        while self.eventos:
+            en, _, evento = self.eventos.popleft()
+            self.avanzar(max(0.0, en - self.transcurrido_escenario()))
+            if 'config' in evento:
+                self.editar_config(evento['config'])
+            accion = evento.get('accion')
+            if accion == 'iniciar':
+                return True
+            if accion == 'fin':
+                return False
+            if accion == 'suspender':
+                self.suspensiones += 1
+                self.inicio += segundos(evento.get('duracion', 0))
+        return False
+
+
+class EscritorDirecto:
+    """Escribe cada línea del log en el momento.
+
+    En tiempo acelerado un lote del escritor asíncrono (LOG_FLUSH_INTERVALO
+    real) abarcaría días virtuales y la rotación por edad se correría.
+    """
+
+    def __init__(self, almacen):
+        self.almacen = almacen
+
+    def escribir(self, linea):
+        self.almacen.escribir(linea)
+
+    def cerrar(self, timeout=None):
+        pass
+
+
+def medir(app, escrituras):
+    """Cuenta las escrituras a disco de una corrida del servicio"""
+    flush = app.estado.flush
+    exportar = app.exportar_metricas
+    registrar = app.historial.registrar
+    registrar_omitidos = app.historial.registrar_omitidos
+
+    def contar_flush():
+        escribio = flush()
+        escrituras['estado'] += escribio
+        return escribio
+
+    def contar_exportacion():
+        antes = app._cambios_exportados
+        exportar()
+        escrituras['metricas'] += app._cambios_exportados != antes
+
+    def contar_registro(*args, **kwargs):
+        escrituras['historial'] += 1
+        return registrar(*args, **kwargs)
+
+    def contar_omitidos(*args, **kwargs):
+        escrituras['historial'] += 1
+        return registrar_omitidos(*args, **kwargs)
+
+    app.estado.flush = contar_flush
+    app.exportar_metricas = contar_exportacion
+    app.historial.registrar = contar_registro
+    app.historial.registrar_omitidos = contar_omitidos
+
+
+def simular(ruta):
+    """Corre el escenario y devuelve el informe como dict"""
+    duracion, inicio, config, eventos, demora = leer_escenario(ruta)
+
+    reloj = RelojEscenario(inicio, eventos)
+    notificador = servicio.NotificadorMemoria(reloj, demora)
+    despachador = servicio.DespachadorNotificaciones(lambda: notificador)
+    # El log rota por edad según la hora virtual
+    servicio.almacen_logs.ahora = lambda: datetime.fromtimestamp(reloj.pared())
+    servicio.escritor_log = EscritorDirecto(servicio.almacen_logs)
+    escritos = {'bytes': 0, 'lineas': 0}
+    escribir_log = servicio.almacen_logs.escribir
+
+    def contar_log(texto):
+        escritos['bytes'] += len(texto.encode('utf-8'))
+        escritos['lineas'] += texto.count('\n')
+        escribir_log(texto)
+
+    servicio.almacen_logs.escribir = contar_log
+    servicio.escribir_json_atomico(servicio.CONFIG_FILE, config)
+
+    escrituras = {'estado': 0, 'metricas': 0, 'historial': 0}
+    metricas = servicio.Metricas()
+    corridas = 0
+    comienzo = time.perf_counter()
+    # ejecutar_servicio() imprime cada aviso; no mezclarlo con el informe
+    with contextlib.redirect_stdout(io.StringIO()):
+        while True:
+            app = servicio.ServicioApp(reloj=reloj, notificador=despachador)
+            app.metricas = metricas
+            medir(app, escrituras)
+            reloj.app = app
+            corridas += 1
+            app.ejecutar_servicio()
+            if not reloj.esperar_inicio():
+                break
+            # Como el botón Iniciar: se borra la señal de detención antes de lanzar
+            estado = servicio.leer_estado() or {}
+            estado['corriendo'] = True
+            servicio.escribir_json_atomico(servicio.STATUS_FILE, estado)
+    segundos_reales = time.perf_counter() - comienzo
+
+    # Error de cada aviso respecto de su plazo (incluye la espera por el límite de entregas)
+    conexion = sqlite3.connect(str(servicio.HISTORY_FILE))
+    try:
+        errores = sorted(abs(fila[0]) for fila in conexion.execute(
+            "SELECT emitido - programado FROM avisos WHERE programado IS NOT NULL"))
+        omitidos = conexion.execute("SELECT COALESCE(SUM(omitidos), 0) FROM resumen_dia").fetchone()[0]
+    finally:
+        conexion.close()
+    contadores = metricas.contadores
+    dias = duracion / 86400
+    return {
+        'dias_simulados': dias,
+        'segundos_reales': segundos_reales,
+        'aceleracion': duracion / segundos_reales if segundos_reales else None,
+        'corridas': corridas,
+        'detenciones': reloj.detenciones,
+        'suspensiones': reloj.suspensiones,
+        'avisos': contadores.get('avisos_emitidos', 0),
+        'notificaciones': len(notificador.enviadas),
+        'avisos_agrupados': contadores.get('avisos_agrupados', 0),
+        'avisos_omitidos': omitidos,
+        'entregas_fallidas': contadores.get('entregas_fallidas', 0),
+        'error_plazo': {
+            'n': len(errores),
+            'media': sum(errores) / len(errores) if errores else None,
+            'p95': errores[min(len(errores) - 1, int(0.95 * len(errores)))] if errores else None,
+            'max': errores[-1] if errores else None,
+        },
+        'escrituras': escrituras,
+        'log': {
+            'lineas': escritos['lineas'],
+            'bytes': escritos['bytes'],
+            'bytes_por_dia': escritos['bytes'] / dias if dias else None,
+            'bytes_en_disco': tamanio(servicio.LOG_FILE) + sum(tamanio(p) for p in servicio.LOGS_DIR.glob('*')),
+            'segmentos': len(list(servicio.LOGS_DIR.glob('*.log.gz'))),
+        },
+        'historial_bytes': sum(tamanio(p) for p in servicio.APP_DATA_DIR.glob('historial.db*')),
+    }
+
+
+def tamanio(ruta):
+    try:
+        return os.path.getsize(ruta)
+    except OSError:
+        return 0
+
+
+def formatear_bytes(n):
+    for unidad in ('B', 'KB', 'MB'):
+        if n < 1024:
+            return f"{n:.0f} {unidad}"
+        n /= 1024
+    return f"{n:.1f} GB"
+
+
+def imprimir(informe):
+    error = informe['error_plazo']
+    escrituras = informe['escrituras']
+    log = informe['log']
+    print(f"Simulación:      {informe['dias_simulados']:g} días en {informe['segundos_reales']:.1f} s "
+          f"(x{informe['aceleracion']:,.0f})")
+    print(f"Corridas:        {informe['corridas']} ({informe['detenciones']} detenciones, "
+          f"{informe['suspensiones']} suspensiones)")
+    print(f"Avisos:          {informe['avisos']} en {informe['notificaciones']} notificaciones "
+          f"({informe['avisos_agrupados']} agrupados, {informe['avisos_omitidos']} omitidos, "
+          f"{informe['entregas_fallidas']} fallidos)")
+    if error['n']:
+        print(f"Error de plazo:  media {error['media']:.3f} s, p95 {error['p95']:.3f} s, máx {error['max']:.3f} s")
+    print(f"Escrituras:      status.json {escrituras['estado']}, métricas {escrituras['metricas']}, "
+          f"historial {escrituras['historial']}")
+    print(f"Log:             {log['lineas']} líneas, {formatear_bytes(log['bytes'])} "
+          f"({formatear_bytes(log['bytes_por_dia'] or 0)} por día); en disco "
+          f"{formatear_bytes(log['bytes_en_disco'])} en {log['segmentos']} segmentos + app.log")
+    print(f"Historial:       {formatear_bytes(informe['historial_bytes'])}")
+
+
+def importar_servicio(directorio):
+    """Importa servicio con sus datos en directorio.
+
+    Si ya estaba importado apunta a los datos reales: simular ahí pisaría
+    config.json y status.json, así que se corta con RuntimeError.
+    """
+    global servicio
+    previo = sys.modules.get('servicio')
+    if previo is not None and Path(previo.APP_DATA_DIR) != directorio:
+        raise RuntimeError(f"servicio ya se importó con los datos en {previo.APP_DATA_DIR}; "
+                           f"la simulación necesita importarlo sobre una carpeta temporal")
+    os.environ['DESPERTADOR_DIR'] = str(directorio)
+    import servicio
+
+
+def main(ruta, como_json=False):
+    """--simulate: código de salida 0, o 1 si el escenario es inválido"""
+    directorio = Path(tempfile.mkdtemp(prefix='despertador-sim-'))
+    try:
+        importar_servicio(directorio)
+        informe = simular(ruta)
+    except (OSError, ValueError) as e:
+        print(f"No se pudo simular el escenario: {str(e)}", file=sys.stderr)
+        return 1
+    finally:
+        shutil.rmtree(directorio, True)
+    if como_json:
+        print(json.dumps(informe, ensure_ascii=False, indent=2))
+    else:
+        imprimir(informe)
+    return 0
@@ -0,0 +1,816 @@
+import sys
+import sqlite3
+import subprocess
+from collections import deque
+from datetime import datetime
+from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel,
+                             QPushButton, QPlainTextEdit, QLineEdit, QMessageBox, QSpinBox,
+                             QDialog, QFormLayout, QComboBox, QTimeEdit, QCheckBox,
+                             QDialogButtonBox, QListWidget)
+from PyQt5.QtCore import (Qt, QTimer, QTime, QObject, QThread, QFileSystemWatcher,
+                          pyqtSignal, pyqtSlot)
+from PyQt5.QtGui import QFont, QColor, QTextCursor
+
+from servicio import (APP_DATA_DIR, LOG_FILE, STATUS_FILE, HISTORY_FILE, INTERVALO_DEFECTO, LATIDO_INTERVALO,
+                      LectorLog, leer_config, leer_estado, guardar_recordatorios, escribir_json_atomico,
+                      enviar_comando, suscribir_eventos, escritor_log, estado_servicio, comando_servicio,
+                      registrar_log)
+from recordatorios import DIAS_LABORABLES, Recordatorio, recordatorios_de_config
+from historial import HistorialAvisos, sumar
+
+# Panel de logs: líneas visibles y líneas recordadas para filtrar
+LOG_PANEL_MAX_LINEAS = 5000
+LOG_HISTORIAL_MAX_LINEAS = 20000
+LOG_CARGA_INICIAL = 500
+
+# Tras un aviso del vigilante de archivos se espera esto antes de releer,
+# para juntar en una lectura los cambios de una misma escritura
+ESPERA_CAMBIOS_MS = 200
+
+
+class TrabajadorDatos(QObject):
+    """Lee y escribe los archivos del servicio en un hilo aparte.
+
+    La interfaz no toca el disco: pide acciones con señales y muestra lo que
+    vuelve por las señales de esta clase. Los datos se releen cuando
+    QFileSystemWatcher avisa que cambió status.json o app.log, o cuando llega
+    un evento IPC. El timer sólo revisa el latido, que vence sin que cambie
+    ningún archivo, y reintenta la suscripción IPC.
+    """
+    datos = pyqtSignal(dict)                # estado (status.json o último evento IPC)
+    servicio = pyqtSignal(dict)             # estado_servicio(): latido y supervisor
+    estadisticas = pyqtSignal(object)       # (hoy, 7 días) del historial, o None
+    logs = pyqtSignal(bool, list)           # (reiniciado, líneas nuevas)
+    config = pyqtSignal(list)               # recordatorios de config.json
+    resultado = pyqtSignal(str, bool, str)  # (acción, ok, mensaje)
+    evento_ipc = pyqtSignal(dict)           # del hilo lector IPC a este hilo
+
+    def __init__(self, registrar_log):
+        super().__init__()
+        self.registrar_log = registrar_log
+        self.conectado_ipc = False
+        self.ultimo_estado = {}
+        # Contador con el que se leyeron las estadísticas por última vez
+        self.contador_estadisticas = None
+
+    @pyqtSlot()
+    def arrancar(self):
+        """Crea lo que vive en el hilo del trabajador y hace la primera lectura"""
+        self.lector_logs = LectorLog(LOG_FILE, LOG_CARGA_INICIAL)
+        # La conexión SQLite se abre en este hilo, al primer uso
+        self.historial = HistorialAvisos(HISTORY_FILE)
+        self.evento_ipc.connect(self.procesar_evento)
+
+        self.espera_cambios = QTimer(self)
+        self.espera_cambios.setSingleShot(True)
+        self.espera_cambios.timeout.connect(self.refrescar)
+        self.vigilante = QFileSystemWatcher(self)
+        self.vigilante.fileChanged.connect(self.archivo_cambiado)
+        self.vigilante.directoryChanged.connect(self.archivo_cambiado)
+        self.vigilar()
+
+        self.timer_latido = QTimer(self)
+        self.timer_latido.timeout.connect(self.revisar_latido)
+        self.timer_latido.start(int(LATIDO_INTERVALO * 1000))
+
+        self.cargar_configuracion()
+        self.refrescar()
+
+    def vigilar(self):
+        """Vuelve a agregar los archivos que el vigilante perdió.
+
+        Un reemplazo atómico (status.json) o una rotación (app.log) cambian el
+        archivo vigilado por otro; el directorio avisa y aquí se recupera.
+        """
+        vigilados = set(self.vigilante.files()) | set(self.vigilante.directories())
+        faltan = [str(ruta) for ruta in (APP_DATA_DIR, STATUS_FILE, LOG_FILE)
+                  if str(ruta) not in vigilados and ruta.exists()]
+        if faltan:
+            self.vigilante.addPaths(faltan)
+
+    @pyqtSlot(str)
+    def archivo_cambiado(self, _ruta):
+        self.vigilar()
+        # No se reinicia si ya está corriendo: con el log creciendo sin parar
+        # se relee igual cada ESPERA_CAMBIOS_MS
+        if not self.espera_cambios.isActive():
+            self.espera_cambios.start(ESPERA_CAMBIOS_MS)
+
+    @pyqtSlot()
+    def refrescar(self):
+        """Relee estado, latido y logs; con canal IPC el estado es el del último evento"""
+        if not self.conectado_ipc:
+            self.ultimo_estado = leer_estado() or {}
+            self.suscribir()
+        self.publicar(self.ultimo_estado)
+
+    @pyqtSlot()
+    def actualizar(self):
+        """Botón Actualizar: relee todo, estadísticas incluidas"""
+        self.contador_estadisticas = None
+        self.refrescar()
+
+    def suscribir(self):
+        if suscribir_eventos(self.evento_ipc.emit):
+            self.conectado_ipc = True
+
+    @pyqtSlot()
+    def revisar_latido(self):
+        if not self.conectado_ipc:
+            self.suscribir()
+        self.servicio.emit(estado_servicio())
+
+    @pyqtSlot(dict)
+    def procesar_evento(self, evento):
+        if evento.get('evento') == 'desconectado':
+            self.conectado_ipc = False
+            self.refrescar()
+            return
+        # El evento trae el estado: no hace falta leer status.json
+        self.ultimo_estado = evento
+        self.publicar(evento)
+
+    def publicar(self, estado):
+        self.datos.emit(estado)
+        self.servicio.emit(estado_servicio())
+        # El historial sólo cambia cuando hay avisos nuevos
+        contador = estado.get('contador_avisos', 0)
+        if contador != self.contador_estadisticas:
+            self.contador_estadisticas = contador
+            self.estadisticas.emit(self.leer_estadisticas())
+        self.leer_logs()
+
+    def leer_estadisticas(self):
+        """Totales de hoy y de los últimos 7 días"""
+        try:
+            dias = self.historial.resumen_dias(7)
+        except sqlite3.Error:
+            return None
+        hoy = datetime.now().strftime('%Y-%m-%d')
+        return sumar([d for d in dias if d['periodo'] == hoy]), sumar(dias)
+
+    def leer_logs(self):
+        """Manda sólo las líneas nuevas del log"""
+        try:
+            leido = self.lector_logs.leer_nuevas()
+        except OSError:
+            return
+        if leido is None:
+            self.logs.emit(True, [])
+        elif leido[0] or leido[1]:
+            self.logs.emit(leido[0], leido[1])
+
+    def cargar_configuracion(self):
+        self.config.emit(list(recordatorios_de_config(leer_config(), INTERVALO_DEFECTO)))
+
+    @pyqtSlot(list)
+    def guardar_recordatorios(self, lista):
+        cantidad = len(lista)
+        respuesta = enviar_comando('recordatorios', lista=lista)
+        if respuesta and respuesta.get('ok'):
+            # El servicio guardó la configuración y ya reprogramó lo que cambió
+            self.resultado.emit('guardar', True, f'Recordatorios actualizados ({cantidad}).')
+            return
+        if respuesta and respuesta.get('error'):
+            self.resultado.emit('guardar', False, respuesta['error'])
+            return
+        try:
+            guardado = guardar_recordatorios(lista)
+        except ValueError as e:
+            self.resultado.emit('guardar', False, str(e))
+            return
+        if guardado:
+            self.registrar_log(f"Configuración actualizada desde GUI: {cantidad} recordatorios")
+            self.resultado.emit('guardar', True, f'Recordatorios actualizados ({cantidad}).\nEl servicio los aplicará al iniciar o en el próximo ciclo.')
+        else:
+            self.resultado.emit('guardar', False, 'No se pudo guardar la configuración')
+
+    @pyqtSlot()
+    def detener_servicio(self):
+        respuesta = enviar_comando('detener')
+        if respuesta and respuesta.get('ok'):
+            self.resultado.emit('detener', True, 'El servicio se está deteniendo.')
+            return
+
+        # Sin canal IPC: dejar la señal en status.json
+        estado = leer_estado()
+        if not estado:
+            self.resultado.emit('detener', False, 'No se pudo leer el estado actual')
+            return
+        estado['corriendo'] = False
+        try:
+            escribir_json_atomico(STATUS_FILE, estado)
+        except Exception as e:
+            self.resultado.emit('detener', False, f'No se pudo actualizar el estado: {str(e)}')
+            return
+        self.resultado.emit('detener', True, 'Se ha enviado la señal de detención.\nEl servicio se detendrá en el próximo ciclo.')
+
+    @pyqtSlot()
+    def iniciar_servicio(self):
+        """Inicia el servicio en un subproceso usando la ruta absoluta del ejecutable y registra errores en el log"""
+        servicio = estado_servicio()
+        if servicio['vivo'] or servicio['supervisor']:
+            # Lanzar otro sería inútil: el candado de instancia única lo rechazaría
+            self.servicio.emit(servicio)
+            self.resultado.emit('iniciar', False, f"El servicio ya está corriendo (PID {servicio['pid'] or '?'})")
+            return
+        try:
+            # Primero reseteamos el estado en disco para evitar que se auto-detenga
+            estado = leer_estado() or {}
+            estado['corriendo'] = True
+            escribir_json_atomico(STATUS_FILE, estado)
+
+            # Ruta absoluta del ejecutable (o del script, en desarrollo)
+            args = comando_servicio('--service')
+            creationflags = subprocess.CREATE_NO_WINDOW if sys.platform == 'win32' else 0
+
+            try:
+                subprocess.Popen(args, creationflags=creationflags)
+            except Exception as e:
+                # Registrar en log si falla el lanzamiento
+                try:
+                    escritor_log.escribir(f"[ERROR] No se pudo lanzar el servicio desde GUI: {str(e)}\n")
+                except:
+                    pass
+                self.resultado.emit('iniciar', False, f'No se pudo iniciar el servicio: {str(e)}')
+                return
+
+            self.resultado.emit('iniciar', True, 'Servicio iniciado correctamente')
+            self.refrescar()
+        except Exception as e:
+            try:
+                escritor_log.escribir(f"[ERROR] No se pudo iniciar el servicio (bloque externo): {str(e)}\n")
+            except:
+                pass
+            self.resultado.emit('iniciar', False, f'No se pudo iniciar el servicio: {str(e)}')
+
+    @pyqtSlot()
+    def limpiar_logs(self):
+        """Vacía el archivo de logs"""
+        try:
+            open(LOG_FILE, 'w').close()
+        except Exception as e:
+            self.resultado.emit('limpiar', False, f'Error al limpiar logs: {str(e)}')
+            return
+        self.leer_logs()
+        self.resultado.emit('limpiar', True, 'Logs limpios correctamente')
+
+
+class DialogoRecordatorio(QDialog):
+    """Formulario para crear o editar un recordatorio"""
+
+    def __init__(self, parent, datos=None):
+        super().__init__(parent)
+        datos = datos or {'nombre': '', 'intervalo': INTERVALO_DEFECTO}
+        self.dias = datos.get('dias')
+        self.resultado = None
+        self.setWindowTitle('Recordatorio')
+        formulario = QFormLayout()
+        self.setLayout(formulario)
+
+        self.input_nombre = QLineEdit(datos.get('nombre', ''))
+        formulario.addRow('Nombre:', self.input_nombre)
+
+        self.combo_tipo = QComboBox()
+        self.combo_tipo.addItems(['Cada N segundos', 'A una hora fija'])
+        formulario.addRow('Tipo:', self.combo_tipo)
+
+        self.spin_intervalo = QSpinBox()
+        self.spin_intervalo.setRange(5, 86400) # 5s to 24h
+        self.spin_intervalo.setValue(int(datos.get('intervalo') or INTERVALO_DEFECTO))
+        formulario.addRow('Intervalo (segundos):', self.spin_intervalo)
+
+        self.input_hora = QTimeEdit(QTime.fromString(datos.get('hora') or '09:00', 'HH:mm'))
+        self.input_hora.setDisplayFormat('HH:mm')
+        formulario.addRow('Hora:', self.input_hora)
+
+        self.check_laborables = QCheckBox('Sólo de lunes a viernes')
+        self.check_laborables.setChecked(self.dias == DIAS_LABORABLES)
+        formulario.addRow('', self.check_laborables)
+
+        self.input_pausas = QLineEdit(', '.join(datos.get('pausas', [])))
+        self.input_pausas.setPlaceholderText('13:00-14:00, 22:00-07:00')
+        formulario.addRow('Pausas:', self.input_pausas)
+
+        self.input_mensaje = QLineEdit(datos.get('mensaje', ''))
+        self.input_mensaje.setPlaceholderText('Título de la notificación (opcional)')
+        formulario.addRow('Mensaje:', self.input_mensaje)
+
+        self.check_activo = QCheckBox('Activo')
+        self.check_activo.setChecked(datos.get('activo', True))
+        formulario.addRow('', self.check_activo)
+
+        botones = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        botones.accepted.connect(self.aceptar)
+        botones.rejected.connect(self.reject)
+        formulario.addRow(botones)
+
+        self.combo_tipo.currentIndexChanged.connect(self.cambiar_tipo)
+        self.combo_tipo.setCurrentIndex(1 if datos.get('hora') else 0)
+        self.cambiar_tipo()
+
+    def cambiar_tipo(self):
+        por_hora = self.combo_tipo.currentIndex() == 1
+        self.spin_intervalo.setEnabled(not por_hora)
+        self.input_hora.setEnabled(por_hora)
+
+    def aceptar(self):
+        """Valida el formulario; si es correcto guarda el resultado y cierra"""
+        datos = {'nombre': self.input_nombre.text().strip()}
+        if self.combo_tipo.currentIndex() == 1:
+            datos['hora'] = self.input_hora.time().toString('HH:mm')
+        else:
+            datos['intervalo'] = self.spin_intervalo.value()
+        if self.check_laborables.isChecked():
+            datos['dias'] = DIAS_LABORABLES
+        elif self.dias is not None and self.dias != DIAS_LABORABLES:
+            # Otros días puestos a mano en config.json: se conservan
+            datos['dias'] = self.dias
+        datos['pausas'] = [p.strip() for p in self.input_pausas.text().split(',') if p.strip()]
+        datos['mensaje'] = self.input_mensaje.text().strip()
+        datos['activo'] = self.check_activo.isChecked()
+        try:
+            self.resultado = Recordatorio.desde_dict(datos).a_dict()
+        except ValueError as e:
+            QMessageBox.warning(self, 'Recordatorio inválido', str(e))
+            return
+        self.accept()
+
+
+class VentanaDespertador(QMainWindow):
+    # Pedidos al trabajador de datos: se atienden en su hilo
+    pedir_actualizacion = pyqtSignal()
+    pedir_guardado = pyqtSignal(list)
+    pedir_detencion = pyqtSignal()
+    pedir_inicio = pyqtSignal()
+    pedir_limpieza = pyqtSignal()
+
+    def __init__(self, registrar_log=registrar_log):
+        super().__init__()
+        self.historial_logs = deque(maxlen=LOG_HISTORIAL_MAX_LINEAS)
+        self.filtro_logs = ''
+        # Últimos valores mostrados, para no tocar widgets si nada cambió
+        self.mostrado = {}
+        self.recordatorios = []
+        self.init_ui()
+
+        # Todo el acceso a disco e IPC corre en el hilo del trabajador
+        self.trabajador = TrabajadorDatos(registrar_log)
+        self.hilo_datos = QThread()
+        self.trabajador.moveToThread(self.hilo_datos)
+        self.trabajador.datos.connect(self.mostrar_datos)
+        self.trabajador.servicio.connect(self.mostrar_estado_servicio)
+        self.trabajador.estadisticas.connect(self.mostrar_estadisticas)
+        self.trabajador.logs.connect(self.agregar_logs)
+        self.trabajador.config.connect(self.cargar_configuracion)
+        self.trabajador.resultado.connect(self.mostrar_resultado)
+        self.pedir_actualizacion.connect(self.trabajador.actualizar)
+        self.pedir_guardado.connect(self.trabajador.guardar_recordatorios)
+        self.pedir_detencion.connect(self.trabajador.detener_servicio)
+        self.pedir_inicio.connect(self.trabajador.iniciar_servicio)
+        self.pedir_limpieza.connect(self.trabajador.limpiar_logs)
+        self.hilo_datos.started.connect(self.trabajador.arrancar)
+        # Se destruye en su hilo, con sus timers y el vigilante
+        self.hilo_datos.finished.connect(self.trabajador.deleteLater)
+        self.hilo_datos.start()
+
+    def closeEvent(self, evento):
+        """Termina el hilo del trabajador antes de cerrar"""
+        self.hilo_datos.quit()
+        self.hilo_datos.wait()
+        super().closeEvent(evento)
+    
+    def init_ui(self):
+        """Inicializa la interfaz gráfica"""
+        self.setWindowTitle('Control Despertador')
+        self.setGeometry(100, 100, 900, 700)
+        self.setStyleSheet("""
+            QMainWindow {
+                background-color: #1e1e1e;
+            }
+            QLabel {
+                color: #ffffff;
+            }
+            QPushButton {
+                background-color: #0078d4;
+                color: #ffffff;
+                border: none;
+                padding: 8px 16px;
+                border-radius: 4px;
+                font-weight: bold;
+            }
+            QPushButton:hover {
+                background-color: #106ebe;
+            }
+            QPushButton:pressed {
+                background-color: #005a9e;
+            }
+            QPlainTextEdit {
+                background-color: #000000;
+                color: #00ff00;
+                border: 1px solid #333333;
+                font-family: Courier;
+                font-size: 8pt;
+            }
+        """)
+        
+        # Widget central
+        central_widget = QWidget()
+        self.setCentralWidget(central_widget)
+        
+        # Layout principal
+        main_layout = QVBoxLayout()
+        central_widget.setLayout(main_layout)
+        
+        # Título
+        titulo = QLabel('Estado del Servicio')
+        titulo_font = QFont('Arial', 16, QFont.Bold)
+        titulo.setFont(titulo_font)
+        main_layout.addWidget(titulo)
+        
+        # Panel de estado
+        estado_layout = QHBoxLayout()
+        
+        # Estado
+        label_estado_titulo = QLabel('Estado:')
+        label_estado_titulo.setFont(QFont('Arial', 10, QFont.Bold))
+        self.label_estado = QLabel('Ejecutándose')
+        self.label_estado.setFont(QFont('Arial', 10))
+        self.label_estado.setStyleSheet("color: #00ff00;")
+        estado_layout.addWidget(label_estado_titulo)
+        estado_layout.addWidget(self.label_estado)
+        
+        # Espaciador
+        estado_layout.addSpacing(40)
+        
+        # Contador
+        label_contador_titulo = QLabel('Últimos avisos:')
+        label_contador_titulo.setFont(QFont('Arial', 10, QFont.Bold))
+        self.label_contador = QLabel('0')
+        self.label_contador.setFont(QFont('Arial', 10))
+        estado_layout.addWidget(label_contador_titulo)
+        estado_layout.addWidget(self.label_contador)
+        
+        # Espaciador
+        estado_layout.addSpacing(40)
+        
+        # Último aviso
+        label_ultimo_titulo = QLabel('Último aviso:')
+        label_ultimo_titulo.setFont(QFont('Arial', 10, QFont.Bold))
+        self.label_ultimo = QLabel('---')
+        self.label_ultimo.setFont(QFont('Arial', 10))
+        estado_layout.addWidget(label_ultimo_titulo)
+        estado_layout.addWidget(self.label_ultimo)
+
+        # Espaciador
+        estado_layout.addSpacing(40)
+
+        # Latencia de entrega y retraso de programación (p50 / p95)
+        label_entrega_titulo = QLabel('Entrega p50/p95:')
+        label_entrega_titulo.setFont(QFont('Arial', 10, QFont.Bold))
+        self.label_entrega = QLabel('---')
+        self.label_entrega.setFont(QFont('Arial', 10))
+        estado_layout.addWidget(label_entrega_titulo)
+        estado_layout.addWidget(self.label_entrega)
+
+        estado_layout.addSpacing(20)
+
+        label_retraso_titulo = QLabel('Retraso p50/p95:')
+        label_retraso_titulo.setFont(QFont('Arial', 10, QFont.Bold))
+        self.label_retraso = QLabel('---')
+        self.label_retraso.setFont(QFont('Arial', 10))
+        estado_layout.addWidget(label_retraso_titulo)
+        estado_layout.addWidget(self.label_retraso)
+        
+        estado_layout.addStretch()
+        main_layout.addLayout(estado_layout)
+
+        # Estadísticas del historial: hoy y últimos 7 días
+        estadisticas_layout = QHBoxLayout()
+        label_estadisticas_titulo = QLabel('Historial:')
+        label_estadisticas_titulo.setFont(QFont('Arial', 10, QFont.Bold))
+        self.label_estadisticas = QLabel('---')
+        self.label_estadisticas.setFont(QFont('Arial', 10))
+        estadisticas_layout.addWidget(label_estadisticas_titulo)
+        estadisticas_layout.addWidget(self.label_estadisticas)
+        estadisticas_layout.addStretch()
+        main_layout.addLayout(estadisticas_layout)
+        
+        # Separador
+        separador = QLabel('─' * 100)
+        separador.setStyleSheet("color: #333333;")
+        main_layout.addWidget(separador)
+
+        # Configuración: lista de recordatorios
+        titulo_config_layout = QHBoxLayout()
+        label_config = QLabel('Recordatorios')
+        label_config.setFont(QFont('Arial', 10, QFont.Bold))
+        titulo_config_layout.addWidget(label_config)
+        titulo_config_layout.addSpacing(40)
+        label_proximo_titulo = QLabel('Próximo:')
+        label_proximo_titulo.setFont(QFont('Arial', 10, QFont.Bold))
+        self.label_proximo = QLabel('---')
+        self.label_proximo.setFont(QFont('Arial', 10))
+        titulo_config_layout.addWidget(label_proximo_titulo)
+        titulo_config_layout.addWidget(self.label_proximo)
+        titulo_config_layout.addStretch()
+        main_layout.addLayout(titulo_config_layout)
+
+        config_layout = QHBoxLayout()
+        self.lista_recordatorios = QListWidget()
+        self.lista_recordatorios.setMaximumHeight(120)
+        self.lista_recordatorios.setStyleSheet("""
+            QListWidget {
+                background-color: #333333;
+                color: #ffffff;
+                border: 1px solid #555555;
+            }
+        """)
+        self.lista_recordatorios.itemDoubleClicked.connect(self.editar_recordatorio)
+        config_layout.addWidget(self.lista_recordatorios)
+
+        botones_config_layout = QVBoxLayout()
+        btn_agregar = QPushButton('Agregar')
+        btn_agregar.clicked.connect(self.agregar_recordatorio)
+        botones_config_layout.addWidget(btn_agregar)
+
+        btn_editar = QPushButton('Editar')
+        btn_editar.clicked.connect(self.editar_recordatorio)
+        botones_config_layout.addWidget(btn_editar)
+
+        btn_quitar = QPushButton('Quitar')
+        btn_quitar.clicked.connect(self.quitar_recordatorio)
+        botones_config_layout.addWidget(btn_quitar)
+
+        btn_guardar_config = QPushButton('Guardar')
+        btn_guardar_config.clicked.connect(self.guardar_configuracion)
+        botones_config_layout.addWidget(btn_guardar_config)
+        botones_config_layout.addStretch()
+        config_layout.addLayout(botones_config_layout)
+        main_layout.addLayout(config_layout)
+        
+        # Separador 2
+        separador2 = QLabel('─' * 100)
+        separador2.setStyleSheet("color: #333333;")
+        main_layout.addWidget(separador2)
+        
+        # Título logs, filtro y búsqueda
+        logs_layout = QHBoxLayout()
+        titulo_logs = QLabel('Logs')
+        titulo_logs.setFont(QFont('Arial', 10, QFont.Bold))
+        logs_layout.addWidget(titulo_logs)
+        logs_layout.addStretch()
+
+        estilo_entrada = """
+            QLineEdit {
+                background-color: #333333;
+                color: #ffffff;
+                padding: 4px;
+                border: 1px solid #555555;
+            }
+        """
+        self.input_filtro = QLineEdit()
+        self.input_filtro.setPlaceholderText('Filtrar líneas...')
+        self.input_filtro.setStyleSheet(estilo_entrada)
+        self.input_filtro.setClearButtonEnabled(True)
+        logs_layout.addWidget(self.input_filtro)
+
+        # El filtro se aplica cuando se deja de escribir, no en cada tecla
+        self.timer_filtro = QTimer()
+        self.timer_filtro.setSingleShot(True)
+        self.timer_filtro.timeout.connect(self.aplicar_filtro)
+        self.input_filtro.textChanged.connect(lambda: self.timer_filtro.start(250))
+
+        self.input_buscar = QLineEdit()
+        self.input_buscar.setPlaceholderText('Buscar...')
+        self.input_buscar.setStyleSheet(estilo_entrada)
+        self.input_buscar.returnPressed.connect(self.buscar_siguiente)
+        logs_layout.addWidget(self.input_buscar)
+
+        btn_buscar = QPushButton('Siguiente')
+        btn_buscar.clicked.connect(self.buscar_siguiente)
+        logs_layout.addWidget(btn_buscar)
+        main_layout.addLayout(logs_layout)
+        
+        # Area de logs: sólo se agregan líneas nuevas y se descartan las más viejas
+        self.text_logs = QPlainTextEdit()
+        self.text_logs.setReadOnly(True)
+        self.text_logs.setFont(QFont('Courier', 8))
+        self.text_logs.setMaximumBlockCount(LOG_PANEL_MAX_LINEAS)
+        main_layout.addWidget(self.text_logs)
+        
+        # Botones
+        botones_layout = QHBoxLayout()
+        
+        btn_actualizar = QPushButton('Actualizar')
+        btn_actualizar.clicked.connect(self.actualizar_datos)
+        botones_layout.addWidget(btn_actualizar)
+        
+        btn_limpiar = QPushButton('Limpiar Logs')
+        btn_limpiar.clicked.connect(self.limpiar_logs)
+        botones_layout.addWidget(btn_limpiar)
+        
+        self.btn_iniciar = QPushButton('Iniciar Servicio')
+        self.btn_iniciar.setStyleSheet("background-color: #107c10;") # Verde
+        self.btn_iniciar.clicked.connect(self.iniciar_servicio)
+        botones_layout.addWidget(self.btn_iniciar)
+        
+        self.btn_detener = QPushButton('Detener Servicio')
+        self.btn_detener.setStyleSheet("background-color: #d13438;") # Rojo
+        self.btn_detener.clicked.connect(self.detener_servicio)
+        botones_layout.addWidget(self.btn_detener)
+        
+        btn_salir = QPushButton('Salir GUI')
+        btn_salir.clicked.connect(self.close)
+        botones_layout.addWidget(btn_salir)
+        
+        botones_layout.addStretch()
+        main_layout.addLayout(botones_layout)
+    
+    def actualizar_datos(self):
+        """Pide al trabajador que relea estado, estadísticas y logs"""
+        self.pedir_actualizacion.emit()
+
+    def mostrar_datos(self, estado):
+        """Muestra estado, contador, último aviso y métricas"""
+        self.mostrar('contador', self.label_contador.setText, str(estado.get('contador_avisos', 0)))
+        self.mostrar('ultimo', self.label_ultimo.setText, estado.get('ultimo_aviso') or '---')
+
+        metricas = estado.get('metricas') or {}
+        self.mostrar('entrega', self.label_entrega.setText,
+                     self.formatear_percentiles(metricas.get('entrega_p50'), metricas.get('entrega_p95')))
+        self.mostrar('retraso', self.label_retraso.setText,
+                     self.formatear_percentiles(metricas.get('retraso_p50'), metricas.get('retraso_p95')))
+
+        proximo = estado.get('proximo')
+        self.mostrar('proximo', self.label_proximo.setText,
+                     f"{proximo['hora']} ({proximo['nombre']})" if proximo else '---')
+
+    def mostrar_estado_servicio(self, servicio):
+        """Muestra si el servicio corre según su latido, no según el 'corriendo' de status.json"""
+        supervisor = servicio['supervisor']
+        if servicio['vivo']:
+            self.mostrar_estado('Ejecutándose (supervisado)' if supervisor else 'Ejecutándose', "#00ff00")
+        elif supervisor and supervisor.get('estado') == 'reiniciando':
+            self.mostrar_estado(f"Reiniciando (intento {supervisor.get('reinicios')})", "#ffaa00")
+        else:
+            self.mostrar_estado('Detenido', "#ff0000")
+        self.mostrar('botones', self.habilitar_botones, servicio['vivo'] or supervisor is not None)
+
+    def mostrar_estadisticas(self, totales):
+        """Muestra avisos, omitidos y fallos de hoy y de los últimos 7 días"""
+        if totales is None:
+            self.label_estadisticas.setText('---')
+            return
+        hoy, semana = totales
+        textos = [self.formatear_resumen('Hoy', hoy), self.formatear_resumen('7 días', semana)]
+        self.label_estadisticas.setText('   |   '.join(textos))
+
+    def formatear_resumen(self, titulo, totales):
+        return (f"{titulo}: {totales['avisos']} avisos, {totales['omitidos']} omitidos, "
+                f"{totales['tasa_fallos'] * 100:.1f}% fallidos")
+
+    def formatear_percentiles(self, p50, p95):
+        if p50 is None or p95 is None:
+            return '---'
+        return f"{p50 * 1000:.0f} / {p95 * 1000:.0f} ms"
+
+    def mostrar(self, clave, aplicar, valor):
+        """Aplica valor a un widget sólo si cambió desde la última vez"""
+        if self.mostrado.get(clave) != valor:
+            self.mostrado[clave] = valor
+            aplicar(valor)
+
+    def mostrar_estado(self, texto, color):
+        self.mostrar('estado', self.label_estado.setText, texto)
+        self.mostrar('estado_color', self.label_estado.setStyleSheet, f"color: {color};")
+
+    def habilitar_botones(self, esta_corriendo):
+        """Habilita Iniciar o Detener según el estado del servicio"""
+        self.btn_iniciar.setEnabled(not esta_corriendo)
+        self.btn_detener.setEnabled(esta_corriendo)
+        if esta_corriendo:
+            self.btn_iniciar.setStyleSheet("background-color: #333333; color: #888888;")
+            self.btn_detener.setStyleSheet("background-color: #d13438;")
+        else:
+            self.btn_iniciar.setStyleSheet("background-color: #107c10;")
+            self.btn_detener.setStyleSheet("background-color: #333333; color: #888888;")
+
+    def agregar_logs(self, reiniciado, nuevas):
+        """Agrega al panel sólo las líneas nuevas del log"""
+        if reiniciado:
+            self.historial_logs.clear()
+            self.text_logs.clear()
+        if not nuevas:
+            return
+
+        self.historial_logs.extend(nuevas)
+        visibles = [linea for linea in nuevas if self.coincide_filtro(linea)]
+        if not visibles:
+            return
+
+        # Auto-scroll sólo si el usuario estaba mirando el final
+        barra = self.text_logs.verticalScrollBar()
+        al_final = barra.value() >= barra.maximum() - 2
+        self.text_logs.appendPlainText(''.join(visibles).rstrip('\n'))
+        if al_final:
+            barra.setValue(barra.maximum())
+
+    def coincide_filtro(self, linea):
+        return not self.filtro_logs or self.filtro_logs in linea.lower()
+
+    def aplicar_filtro(self):
+        """Vuelve a armar el panel con las líneas del historial que coinciden con el filtro"""
+        self.filtro_logs = self.input_filtro.text().strip().lower()
+        visibles = [linea for linea in self.historial_logs if self.coincide_filtro(linea)]
+        self.text_logs.setPlainText(''.join(visibles[-LOG_PANEL_MAX_LINEAS:]).rstrip('\n'))
+        self.text_logs.moveCursor(QTextCursor.End)
+
+    def buscar_siguiente(self):
+        """Selecciona la próxima aparición del texto buscado, volviendo al inicio al llegar al final"""
+        texto = self.input_buscar.text()
+        if not texto:
+            return
+        if not self.text_logs.find(texto):
+            self.text_logs.moveCursor(QTextCursor.Start)
+            self.text_logs.find(texto)
+    
+    def limpiar_logs(self):
+        """Limpia el archivo de logs"""
+        reply = QMessageBox.question(
+            self,
+            'Confirmar',
+            '¿Está seguro de que desea limpiar el archivo de logs?',
+            QMessageBox.Yes | QMessageBox.No,
+            QMessageBox.No
+        )
+        
+        if reply == QMessageBox.Yes:
+            self.pedir_limpieza.emit()
+
+    def mostrar_resultado(self, accion, ok, mensaje):
+        """Informa el resultado de una acción que hizo el trabajador"""
+        if not ok:
+            QMessageBox.critical(self, 'Error', mensaje)
+            return
+        if accion == 'detener':
+            self.mostrar_estado('Deteniéndose...', "#ffa500")
+        QMessageBox.information(self, 'Éxito', mensaje)
+
+    def cargar_configuracion(self, recordatorios):
+        """Carga la configuración en la interfaz"""
+        self.recordatorios = recordatorios
+        self.mostrar_recordatorios()
+
+    def mostrar_recordatorios(self):
+        """Vuelve a llenar la lista con self.recordatorios"""
+        self.lista_recordatorios.clear()
+        for datos in self.recordatorios:
+            try:
+                descripcion = Recordatorio.desde_dict(datos).describir()
+            except ValueError as e:
+                descripcion = f"inválido: {str(e)}"
+            self.lista_recordatorios.addItem(f"{datos.get('nombre', '?')} - {descripcion}")
+
+    def agregar_recordatorio(self):
+        dialogo = DialogoRecordatorio(self)
+        if dialogo.exec_() == QDialog.Accepted:
+            self.recordatorios.append(dialogo.resultado)
+            self.mostrar_recordatorios()
+
+    def editar_recordatorio(self):
+        fila = self.lista_recordatorios.currentRow()
+        if fila < 0:
+            return
+        dialogo = DialogoRecordatorio(self, self.recordatorios[fila])
+        if dialogo.exec_() == QDialog.Accepted:
+            self.recordatorios[fila] = dialogo.resultado
+            self.mostrar_recordatorios()
+            self.lista_recordatorios.setCurrentRow(fila)
+
+    def quitar_recordatorio(self):
+        fila = self.lista_recordatorios.currentRow()
+        if fila >= 0:
+            del self.recordatorios[fila]
+            self.mostrar_recordatorios()
+
+    def guardar_configuracion(self):
+        """Guarda la lista de recordatorios desde la interfaz"""
+        self.pedir_guardado.emit(list(self.recordatorios))
+
+    def detener_servicio(self):
+        """Envía señal para detener el servicio"""
+        reply = QMessageBox.question(
+            self,
+            'Confirmar',
+            '¿Está seguro de que desea detener el servicio en segundo plano?\nEsto hará que dejen de llegar los avisos.',
+            QMessageBox.Yes | QMessageBox.No,
+            QMessageBox.No
+        )
+        
+        if reply == QMessageBox.Yes:
+            self.pedir_detencion.emit()
+
+    def iniciar_servicio(self):
+        """Pide al trabajador que lance el servicio"""
+        self.pedir_inicio.emit()